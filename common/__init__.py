@@ -7,7 +7,16 @@
 """
 
 from .log_utils import log_info, log_warn, log_error
-from .ssh_client import SSHClient
+
+
+def __getattr__(name):
+    # SSHClient 按需导入，避免仅使用日志等工具时加载 SSH 相关依赖
+    if name == 'SSHClient':
+        from .ssh_client import SSHClient
+        globals()['SSHClient'] = SSHClient
+        return SSHClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'log_info',
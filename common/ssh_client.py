@@ -8,6 +8,8 @@ SSH 客户端模块
 
 import os
 import time
+import threading
+import hashlib
 from typing import Optional, Any, Callable, List, Dict, Tuple
 from rich.progress import Progress, TaskID, BarColumn, TimeElapsedColumn, SpinnerColumn, TextColumn, DownloadColumn
 import concurrent.futures
@@ -20,6 +22,40 @@ from .log_utils import log_info, log_error
 # import paramiko
 # from scp import SCPClient
 
+# SFTP 通道窗口大小（64 MiB）：paramiko 默认 2 MiB 窗口在高延迟链路上会限制单通道吞吐
+SFTP_WINDOW_SIZE = 64 * 1024 * 1024
+# SFTP 最大数据包大小（32 KiB，与 OpenSSH sftp-server 的上限一致）
+SFTP_MAX_PACKET_SIZE = 32768
+
+# 已解析的私钥缓存: {(密钥路径, mtime_ns): PKey}，同一进程内重复连接时跳过密钥解析
+_PKEY_CACHE: Dict[Tuple[str, int], Any] = {}
+
+
+def _load_private_key(key_path: str, passphrase: Optional[str] = None) -> Optional[Any]:
+    """
+    读取并解析私钥（按路径和修改时间缓存）
+    参数:
+        key_path: 私钥文件路径
+        passphrase: 私钥密码（可选）
+    返回:
+        paramiko PKey 实例，解析失败时返回 None（由调用方回退到 key_filename）
+    """
+    try:
+        cache_key = (key_path, os.stat(key_path).st_mtime_ns)
+    except OSError:
+        return None
+    pkey = _PKEY_CACHE.get(cache_key)
+    if pkey is None:
+        try:
+            # 延迟导入 paramiko
+            from paramiko import PKey
+            pkey = PKey.from_path(key_path, passphrase=passphrase)
+        except Exception:
+            return None
+        _PKEY_CACHE[cache_key] = pkey
+    return pkey
+
+
 class SSHClient:
     """SSH 客户端类，提供连接和命令执行功能"""
     
@@ -30,7 +66,17 @@ class SSHClient:
             cls._instance = super(SSHClient, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 user: Optional[str] = None, key_path: Optional[str] = None,
+                 password: Optional[str] = None):
+        """
+        参数:
+            host: 服务器地址（不传时从环境变量 SERVER_IP 等读取连接信息）
+            port: 端口，默认 22
+            user: 用户名
+            key_path: SSH 私钥路径（可选）
+            password: 密码或私钥 passphrase（可选）
+        """
         if not hasattr(self, 'conn'):  # 确保只初始化一次
             # 延迟导入，避免启动时加载
             from fabric import Connection as _Connection
@@ -38,6 +84,35 @@ class SSHClient:
             Connection = _Connection
             
             self.conn: Optional[Any] = None  # 类型改为 Any，因为 Connection 是延迟导入的
+            self._conn_key: Optional[str] = None  # 当前连接对应的目标标识（见 _connection_key）
+            self._params: Optional[Dict[str, Any]] = None  # 显式传入的连接参数
+            self._conn_lock = threading.Lock()  # 多个上传线程同时发现断线时只重连一次
+        
+        if host is not None:
+            self._params = {
+                'host': host,
+                'port': int(port) if port else 22,
+                'user': user,
+                'key_path': key_path,
+                'password': password,
+            }
+
+    def get_target(self) -> Dict[str, Any]:
+        """
+        获取当前连接目标（显式参数优先，否则读取环境变量）
+        返回:
+            包含 host、port、user、key_path、password 的字典
+        """
+        if self._params is not None:
+            return self._params
+        server_port = EnvUtils.get('SERVER_PORT')
+        return {
+            'host': EnvUtils.get('SERVER_IP'),
+            'port': int(server_port) if server_port else 22,
+            'user': EnvUtils.get('SERVER_USER'),
+            'key_path': EnvUtils.get('SSH_KEY_PATH'),
+            'password': EnvUtils.get('SSH_PASSWORD'),
+        }
 
     def disconnect(self):
         """关闭远程连接"""
@@ -45,6 +120,7 @@ class SSHClient:
             self.conn.close()
             log_info("远程连接已关闭")
             self.conn = None
+            self._conn_key = None
 
     def run(self, command: str, hide: bool = False) -> Any:
         """
@@ -89,7 +165,48 @@ class SSHClient:
         except Exception as e:
             log_error(f"本地命令执行失败: {e}")
             return None
-        
+
+    def get_transport(self) -> Optional[Any]:
+        """
+        获取底层 paramiko Transport（用于在同一连接上打开额外通道）
+        返回:
+            Transport 实例，连接失败时返回 None
+        """
+        if not self.__check_connection():
+            return None
+        try:
+            return self.conn.client.get_transport()
+        except Exception as e:
+            log_error(f"获取 SSH Transport 失败: {e}")
+            return None
+
+    def ping(self) -> bool:
+        """
+        检查连接是否可用（基于 Transport 状态，不额外执行远程命令）
+        返回:
+            连接是否处于活跃状态
+        """
+        transport = self.get_transport()
+        return transport is not None and transport.is_active()
+
+    def open_sftp(self) -> Optional[Any]:
+        """
+        在已有连接上打开一个新的 SFTP 通道（同一 Transport 可同时打开多个，上限为服务端 MaxSessions）
+        返回:
+            paramiko SFTPClient 实例，失败时返回 None
+        """
+        transport = self.get_transport()
+        if transport is None:
+            return None
+        try:
+            # 延迟导入 paramiko
+            import paramiko
+            return paramiko.SFTPClient.from_transport(
+                transport, window_size=SFTP_WINDOW_SIZE, max_packet_size=SFTP_MAX_PACKET_SIZE
+            )
+        except Exception as e:
+            log_error(f"打开 SFTP 通道失败: {e}")
+            return None
 
        
     
@@ -109,9 +226,16 @@ class SSHClient:
             return False
             
         try:
-            # 如果没有进度回调，使用简单的 fabric put
+            # 如果没有进度回调，使用调大窗口的 SFTP 通道上传，打开失败时回退到 fabric put
             if progress_callback is None:
-                self.conn.put(local_path, remote_path)
+                sftp = self.open_sftp()
+                if sftp is None:
+                    self.conn.put(local_path, remote_path)
+                    return True
+                try:
+                    sftp.put(local_path, remote_path)
+                finally:
+                    sftp.close()
                 return True
             
             # 如果有进度回调，使用 fabric 的底层 paramiko 连接
@@ -139,24 +263,32 @@ class SSHClient:
 
 
 
+    def _connection_key(self) -> str:
+        """
+        根据连接目标生成确定性标识
+        返回:
+            (host, port, user, key_path) 的 blake2b 摘要
+        """
+        params = self.get_target()
+        target = "\0".join(str(params[key] or '') for key in ('host', 'port', 'user', 'key_path'))
+        return hashlib.blake2b(target.encode('utf-8'), digest_size=8).hexdigest()
+
     def __create_connection(self) -> Optional[Any]:
         """创建 SSH 连接"""
         try:
             # 延迟导入
             from fabric import Connection
             
-            server_ip = EnvUtils.get('SERVER_IP')
-            server_port = EnvUtils.get('SERVER_PORT')  # 新增：获取端口
-            server_user = EnvUtils.get('SERVER_USER')
-            ssh_password = EnvUtils.get('SSH_PASSWORD')
-            ssh_key_path = EnvUtils.get('SSH_KEY_PATH')  # 新增：SSH 密钥路径
+            params = self.get_target()
+            server_ip = params['host']
+            server_user = params['user']
+            ssh_password = params['password']
+            ssh_key_path = params['key_path']
+            port = params['port']
 
             if not all([server_ip, server_user]):
                 log_error("缺少必要的连接信息")
                 return None
-            
-            # 端口默认为 22
-            port = int(server_port) if server_port else 22
 
             # 创建连接配置
             connect_kwargs = {
@@ -171,10 +303,15 @@ class SSHClient:
                 try:
                     log_info(f"尝试使用 SSH 密钥认证: {ssh_key_path}")
                     key_kwargs = connect_kwargs.copy()
-                    key_kwargs["key_filename"] = ssh_key_path
-                    # 如果有密码，作为密钥的 passphrase
-                    if ssh_password:
-                        key_kwargs["passphrase"] = ssh_password
+                    pkey = _load_private_key(ssh_key_path, ssh_password or None)
+                    if pkey is not None:
+                        # 直接使用已解析的私钥，避免 paramiko 再次读取并逐个尝试密钥类型
+                        key_kwargs["pkey"] = pkey
+                    else:
+                        key_kwargs["key_filename"] = ssh_key_path
+                        # 如果有密码，作为密钥的 passphrase
+                        if ssh_password:
+                            key_kwargs["passphrase"] = ssh_password
                     
                     # 创建链接
                     log_info(f"正在创建与服务器 {server_ip}:{port} 的链接...")
@@ -185,9 +322,10 @@ class SSHClient:
                         connect_kwargs=key_kwargs
                     )
                     
-                    # 测试连接
-                    self.conn.run("echo 'Connection test'", hide=True)
+                    # 显式建立连接（完成握手和认证），不执行远程命令
+                    self.conn.open()
                     log_info("SSH 密钥认证成功，远程连接建立成功")
+                    self.__keep_alive()
                     connection_established = True
                     return self.conn
                     
@@ -214,9 +352,10 @@ class SSHClient:
                         connect_kwargs=pwd_kwargs
                     )
                     
-                    # 测试连接
-                    self.conn.run("echo 'Connection test'", hide=True)
+                    # 显式建立连接（完成握手和认证），不执行远程命令
+                    self.conn.open()
                     log_info("密码认证成功，远程连接建立成功")
+                    self.__keep_alive()
                     connection_established = True
                     return self.conn
                     
@@ -233,16 +372,34 @@ class SSHClient:
             return None
 
 
-    def __check_connection(self) -> bool:
-        """检查连接是否有效"""
-        if self.conn is None:
-            return self.__create_connection() is not None
+    def __keep_alive(self) -> None:
+        """记录连接目标并开启 keepalive，使连接在部署各阶段之间保持可复用"""
+        self._conn_key = self._connection_key()
         try:
-            self.conn.run("echo 'Connection test'", hide=True)
-            return True
+            self.conn.client.get_transport().set_keepalive(30)
         except Exception:
+            pass
+
+    def __check_connection(self) -> bool:
+        """
+        检查连接是否有效（同一目标且 Transport 仍活跃时直接复用，不再额外执行远程命令）
+        
+        检查和重连在锁内进行：多个线程同时发现断线时，只有第一个线程重新建立连接，
+        其余线程等待后直接复用新连接，不会互相覆盖 self.conn 而遗留连接。
+        """
+        with self._conn_lock:
+            if self.conn is None:
+                return self.__create_connection() is not None
+            if self._conn_key != self._connection_key():
+                # 连接目标已变化（切换了服务器或认证方式），关闭旧连接后重新建立
+                self.disconnect()
+                return self.__create_connection() is not None
+            try:
+                transport = self.conn.client.get_transport()
+                if transport is not None and transport.is_active():
+                    return True
+            except Exception:
+                pass
             log_error("连接已断开，重新建立连接")
+            self.disconnect()
             return self.__create_connection() is not None
-
-
-
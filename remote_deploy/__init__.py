@@ -9,10 +9,25 @@
 __version__ = '1.0.0'
 __author__ = 'Your Name'
 
-from .deploy_service import RemoteDeployService
-from .config_manager import ConfigManager
-from .file_uploader import FileUploader
-from .command_executor import CommandExecutor
+import importlib
+
+# 子模块按需导入：导入包内任一模块（如 config_manager）时不再连带加载 SSH、上传等重量级依赖
+_LAZY_EXPORTS = {
+    'RemoteDeployService': '.deploy_service',
+    'ConfigManager': '.config_manager',
+    'FileUploader': '.file_uploader',
+    'CommandExecutor': '.command_executor',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'RemoteDeployService',
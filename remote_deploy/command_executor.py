@@ -6,7 +6,14 @@
 负责在远程服务器上执行命令
 """
 
-from typing import List, Tuple, Any
+import re
+import sys
+import time
+import uuid
+import codecs
+import socket
+import selectors
+from typing import List, Tuple, Any, Optional, Union
 from common.ssh_client import SSHClient
 from common.log_utils import log_info, log_warn, log_error
 
@@ -14,19 +21,33 @@ from common.log_utils import log_info, log_warn, log_error
 class CommandExecutor:
     """命令执行器类"""
     
-    def __init__(self, ssh_client: SSHClient):
+    # 通道读取块大小
+    RECV_SIZE = 32768
+    
+    # 通道无输出时，每隔该秒数检查一次连接是否仍然存活（连接已断开时不再无限等待）
+    IDLE_CHECK_INTERVAL = 60
+    
+    # 并行命令同时打开的最大通道数（OpenSSH 默认 MaxSessions 为 10）
+    MAX_SESSIONS = 10
+    
+    def __init__(self, ssh_client: SSHClient, command_timeout: Optional[float] = None):
         """
         初始化命令执行器
         
         Args:
             ssh_client: SSH 客户端实例
+            command_timeout: 会话中单条命令的最长执行时间（秒，可选，默认不限制）
         """
         self.ssh_client = ssh_client
+        self.command_timeout = command_timeout
     
-    def execute_command_group(self, commands: List[str], group_name: str, keep_session: bool = True) -> bool:
+    def execute_command_group(self, commands: List[Union[str, List[str]]], group_name: str,
+                              keep_session: bool = True) -> bool:
         """
         执行命令组
         
+        命令列表中的子列表表示一批互不依赖的命令，会在各自的通道中并行执行。
+        
         Args:
             commands: 命令列表
             group_name: 命令组名称
@@ -39,9 +60,12 @@ class CommandExecutor:
             log_warn(f"命令组 '{group_name}' 为空，跳过执行")
             return True
         
+        if any(isinstance(command, list) for command in commands):
+            return self._execute_segments(commands, group_name, keep_session)
+        
         log_info(f"执行命令组: {group_name} (共 {len(commands)} 条命令)")
         
-        # 如果启用保持会话，将所有命令合并为一条执行
+        # 如果启用保持会话，合并为一个脚本在同一会话中执行
         if keep_session and len(commands) > 1:
             return self._execute_commands_in_session(commands, group_name)
         
@@ -59,9 +83,116 @@ class CommandExecutor:
         log_info(f"命令组 '{group_name}' 执行成功")
         return True
     
+    def _execute_segments(self, commands: List[Union[str, List[str]]], group_name: str,
+                          keep_session: bool) -> bool:
+        """
+        按顺序执行由普通命令段和并行批次组成的命令组
+        
+        连续的普通命令作为一段在同一会话中执行；并行批次前后的命令段不共享会话状态。
+        
+        Args:
+            commands: 命令列表（子列表为并行批次）
+            group_name: 命令组名称
+            keep_session: 是否保持会话状态
+            
+        Returns:
+            bool: 执行是否成功
+        """
+        segment: List[str] = []
+        for item in commands + [[]]:
+            if not isinstance(item, list):
+                segment.append(item)
+                continue
+            if segment and not self.execute_command_group(segment, group_name, keep_session):
+                return False
+            segment = []
+            if item and not self.run_concurrent(item, group_name):
+                return False
+        return True
+    
+    def run_concurrent(self, commands: List[str], group_name: str) -> bool:
+        """
+        在同一连接的多个通道上并行执行互不依赖的命令
+        
+        最多同时打开 MAX_SESSIONS 个通道，某个命令结束后立即补充下一条（滑动窗口）；
+        使用 selectors 同时等待所有通道的输出。每条命令的输出在全部完成后按声明顺序显示。
+        
+        Args:
+            commands: 命令列表
+            group_name: 命令组名称
+            
+        Returns:
+            bool: 是否全部执行成功
+        """
+        transport = self.ssh_client.get_transport()
+        if transport is None:
+            log_error("SSH 连接不可用，无法并行执行命令")
+            return False
+        
+        for idx, command in enumerate(commands, 1):
+            log_info(f"[并行 {idx}/{len(commands)}] 执行命令: {command}")
+        
+        pending = list(enumerate(commands))
+        results: List[Optional[Tuple[str, int, str]]] = [None] * len(commands)
+        active = {}  # {通道: (序号, 命令, 输出块)}
+        selector = selectors.DefaultSelector()
+        
+        def launch():
+            while pending and len(active) < self.MAX_SESSIONS:
+                idx, command = pending.pop(0)
+                try:
+                    chan = transport.open_session()
+                    chan.set_combine_stderr(True)
+                    chan.exec_command(command)
+                except Exception as e:
+                    results[idx] = (command, -1, f"打开执行通道失败: {e}")
+                    continue
+                active[chan] = (idx, command, [])
+                selector.register(chan, selectors.EVENT_READ)
+        
+        try:
+            launch()
+            while active:
+                for key, _ in selector.select(timeout=1.0):
+                    chan = key.fileobj
+                    idx, command, chunks = active[chan]
+                    data = chan.recv(self.RECV_SIZE)
+                    if data:
+                        chunks.append(data)
+                        continue
+                    
+                    # 输出结束，收集退出码并补充下一条命令
+                    selector.unregister(chan)
+                    del active[chan]
+                    exit_code = chan.recv_exit_status()
+                    chan.close()
+                    results[idx] = (command, exit_code, b"".join(chunks).decode("utf-8", errors="replace"))
+                    launch()
+        finally:
+            for chan in active:
+                chan.close()
+            selector.close()
+        
+        success = True
+        for command, exit_code, output in filter(None, results):
+            if exit_code != 0:
+                self._handle_command_failure(command, exit_code, output)
+                success = False
+            elif output:
+                sys.stdout.write(output if output.endswith("\n") else output + "\n")
+        sys.stdout.flush()
+        
+        if success:
+            log_info(f"命令组 '{group_name}' 并行批次执行成功 (共 {len(commands)} 条命令)")
+        return success
+    
     def _execute_commands_in_session(self, commands: List[str], group_name: str) -> bool:
         """
-        在同一个会话中执行多条命令（使用 && 连接）
+        在同一个会话中执行多条命令（合并为一个 POSIX 脚本，通过单个通道交给用户的 shell 执行）
+        
+        每条命令后输出带随机标记的哨兵行（含退出码），据此记录逐条结果；
+        任一命令失败即退出脚本。无法打开执行通道，或 shell 无法启动（第一条命令前通道即以
+        退出码 127 关闭）时回退到 && 合并执行。
         
         Args:
             commands: 命令列表
@@ -74,6 +205,89 @@ class CommandExecutor:
         for idx, command in enumerate(commands, 1):
             log_info(f"[{idx}/{len(commands)}] 执行命令: {command}")
         
+        chan = None
+        transport = self.ssh_client.get_transport()
+        if transport is not None:
+            try:
+                chan = transport.open_session()
+                chan.set_combine_stderr(True)
+                chan.exec_command('exec "${SHELL:-/bin/sh}" -s')
+            except Exception as e:
+                log_warn(f"无法打开执行通道，改为 && 合并执行: {e}")
+                chan = None
+        if chan is None:
+            return self._execute_joined(commands, group_name)
+        
+        token = uuid.uuid4().hex
+        end_re = re.compile(rf"__END_{token}_(\d+)__")
+        
+        log_info("在同一会话中执行所有命令...")
+        
+        try:
+            chan.sendall(self._build_group_script(commands, token).encode())
+            chan.shutdown_write()
+            
+            for idx, command in enumerate(commands):
+                try:
+                    output, exit_code = self._read_until(chan, end_re, echo=True)
+                except socket.timeout:
+                    self._handle_command_failure(command, -1, f"命令执行超时（超过 {self.command_timeout} 秒）")
+                    return False
+                
+                if exit_code is None:
+                    # 通道在哨兵行之前关闭：shell 本身无法启动时改为 && 合并执行，否则按失败处理
+                    status = chan.recv_exit_status()
+                    if idx == 0 and status == 127:
+                        log_warn("远程 shell 无法执行脚本，改为 && 合并执行")
+                        return self._execute_joined(commands, group_name)
+                    self._handle_command_failure(command, status if status != 0 else -1,
+                                                 output or "执行通道已关闭")
+                    return False
+                
+                if exit_code != 0:
+                    self._handle_command_failure(command, exit_code, output)
+                    return False
+        finally:
+            chan.close()
+        
+        log_info(f"命令组 '{group_name}' 执行成功")
+        return True
+    
+    @staticmethod
+    def _build_group_script(commands: List[str], token: str) -> str:
+        """
+        将命令列表合并为一个 shell 脚本
+        
+        每条命令的标准输入重定向到 /dev/null，避免读取标准输入的命令吞掉后续脚本内容。
+        
+        Args:
+            commands: 命令列表
+            token: 哨兵标记中的随机串
+            
+        Returns:
+            str: 脚本内容
+        """
+        parts = []
+        for command in commands:
+            parts.append(
+                f"{{\n{command}\n}} </dev/null\n"
+                f"__rc=$?\n"
+                f"printf '\\n__END_%s_%d__\\n' {token} $__rc\n"
+                f"[ $__rc -eq 0 ] || exit $__rc\n"
+            )
+        return "".join(parts)
+    
+    def _execute_joined(self, commands: List[str], group_name: str) -> bool:
+        """
+        将多条命令用 && 连接为一条执行（无法打开执行通道时的回退方式）
+        
+        Args:
+            commands: 命令列表
+            group_name: 命令组名称
+            
+        Returns:
+            bool: 执行是否成功
+        """
         # 将命令用 && 连接（任何一条失败就停止）
         combined_command = " && ".join(commands)
         
@@ -89,6 +303,74 @@ class CommandExecutor:
         log_info(f"命令组 '{group_name}' 执行成功")
         return True
     
+    def _read_until(self, chan: Any, marker_re: "re.Pattern[str]", echo: bool) -> Tuple[str, Optional[int]]:
+        """
+        从通道读取输出直到出现标记行
+        
+        Args:
+            chan: paramiko 通道
+            marker_re: 标记行正则（可带一个退出码分组）
+            echo: 是否实时输出已读取的完整行
+            
+        Returns:
+            Tuple[str, Optional[int]]: (标记之前的输出, 退出码)；未读到标记行通道就已关闭时，
+                返回已读取的全部输出，退出码为 None
+            
+        Raises:
+            socket.timeout: 配置了 command_timeout 且超时仍未读到标记行
+        """
+        buffer = ""
+        lines: List[str] = []
+        # 增量解码：多字节字符被拆在两次读取之间时不会变成乱码
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        deadline = time.monotonic() + self.command_timeout if self.command_timeout else None
+        
+        while True:
+            match = marker_re.search(buffer)
+            if match:
+                before = buffer[:match.start()]
+                if before.strip():
+                    lines.append(before)
+                    if echo:
+                        sys.stdout.write(before)
+                        sys.stdout.flush()
+                exit_code = int(match.group(1)) if match.groups() else 0
+                return "".join(lines).rstrip("\r\n"), exit_code
+            
+            # 实时输出已完整的行，保留末尾可能是标记的半行
+            if "\n" in buffer:
+                head, buffer = buffer.rsplit("\n", 1)
+                head += "\n"
+                lines.append(head)
+                if echo:
+                    sys.stdout.write(head)
+                    sys.stdout.flush()
+            
+            wait = self.IDLE_CHECK_INTERVAL
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout()
+                wait = min(wait, remaining)
+            chan.settimeout(wait)
+            try:
+                data = chan.recv(self.RECV_SIZE)
+            except socket.timeout:
+                # 暂无输出：连接仍存活时继续等待，连接已断开时按通道关闭处理
+                transport = chan.get_transport()
+                if not chan.closed and transport is not None and transport.is_active():
+                    continue
+                data = b""
+            if not data:
+                buffer += decoder.decode(b"", final=True)
+                if buffer:
+                    lines.append(buffer)
+                    if echo:
+                        sys.stdout.write(buffer)
+                        sys.stdout.flush()
+                return "".join(lines).rstrip("\r\n"), None
+            buffer += decoder.decode(data)
+    
     def _execute_single_command(self, command: str, hide: bool = False) -> Tuple[bool, str, int]:
         """
         执行单条命令
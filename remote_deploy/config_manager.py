@@ -9,9 +9,14 @@
 import os
 import sys
 import yaml
+import pickle
+import hashlib
+import marshal
 import shutil
+import tempfile
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from common.log_utils import log_info, log_warn, log_error
 from common.path_utils import expand_path, validate_path
 from rich.console import Console
@@ -19,6 +24,122 @@ from rich.panel import Panel
 
 console = Console()
 
+# 优先使用 libyaml 的 C 解析器（PyYAML 官方 wheel 已内置），不可用时回退到纯 Python 实现
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+@lru_cache(maxsize=8)
+def _load_config_snapshot(config_path: str, mtime_ns: int, size: int) -> Optional[bytes]:
+    """
+    读取配置文件的解析结果（序列化后的字节串）
+    
+    进程内按 (路径, mtime, size) 缓存；进程间通过用户缓存目录中的 marshal 文件缓存，
+    二者都未命中时才解析 YAML。
+    
+    Args:
+        config_path: 配置文件路径
+        mtime_ns: 配置文件修改时间（纳秒）
+        size: 配置文件大小
+        
+    Returns:
+        Optional[bytes]: pickle 序列化后的配置（仅在进程内使用），配置文件为空时返回 None
+    """
+    cache_path = _snapshot_cache_path(config_path)
+    data = _read_snapshot_cache(cache_path, config_path, mtime_ns, size)
+    if data is None:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=_YamlLoader)
+        if data is None:
+            return None
+        _write_snapshot_cache(cache_path, config_path, mtime_ns, size, data)
+    return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _snapshot_cache_path(config_path: str) -> str:
+    """
+    配置解析缓存文件路径（位于用户配置目录下，按配置文件绝对路径区分）
+    
+    Args:
+        config_path: 配置文件路径
+        
+    Returns:
+        str: 缓存文件路径
+    """
+    digest = hashlib.sha1(os.path.abspath(config_path).encode('utf-8')).hexdigest()
+    return str(ConfigManager.USER_CONFIG_DIR / 'cache' / f'{digest}.marshal')
+
+
+def _read_snapshot_cache(cache_path: str, config_path: str, mtime_ns: int, size: int) -> Optional[Any]:
+    """
+    读取配置解析缓存文件
+    
+    缓存使用 marshal 格式（只能还原基本数据类型，不会像 pickle 那样执行代码），
+    且只接受当前用户所有、其他用户不可写的文件。
+    
+    Args:
+        cache_path: 缓存文件路径
+        config_path: 配置文件路径
+        mtime_ns: 配置文件修改时间（纳秒）
+        size: 配置文件大小
+        
+    Returns:
+        Optional[Any]: 缓存的配置数据，缓存不存在或已失效时返回 None
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if hasattr(os, 'getuid') and (st.st_uid != os.getuid() or st.st_mode & 0o022):
+                return None
+            cached = marshal.load(f)
+    except Exception:
+        # 缓存不存在或已损坏，忽略
+        return None
+    
+    if not isinstance(cached, tuple) or len(cached) != 4:
+        return None
+    cached_path, cached_mtime_ns, cached_size, data = cached
+    if (cached_path, cached_mtime_ns, cached_size) != (os.path.abspath(config_path), mtime_ns, size):
+        return None
+    return data
+
+
+def _write_snapshot_cache(cache_path: str, config_path: str, mtime_ns: int, size: int, data: Any):
+    """
+    原子写入配置解析缓存文件（先写权限为 0600 的临时文件再替换）
+    
+    Args:
+        cache_path: 缓存文件路径
+        config_path: 配置文件路径
+        mtime_ns: 配置文件修改时间（纳秒）
+        size: 配置文件大小
+        data: 解析后的配置
+    """
+    try:
+        payload = marshal.dumps((os.path.abspath(config_path), mtime_ns, size, data))
+    except ValueError:
+        # 含 marshal 不支持的类型（如 YAML 日期），只在进程内缓存
+        return
+    
+    tmp_path = None
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.config-', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        # 缓存写入失败（如目录只读），不影响主流程
+        if tmp_path and os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
 class ConfigManager:
     """配置管理器类"""
     
@@ -167,6 +288,8 @@ class ConfigManager:
         
         self.config_path = config_path
         self.config: Optional[Dict[str, Any]] = None
+        # 选择界面使用的索引: {服务器名称: (上传索引, 命令索引)}（见 _build_server_indexes）
+        self._server_indexes: Dict[str, Tuple[tuple, tuple]] = {}
     
     def load_config(self) -> bool:
         """
@@ -181,10 +304,14 @@ class ConfigManager:
                 log_error(f"配置文件不存在: {self.config_path}")
                 return False
             
-            # 读取配置文件
+            # 重新加载时清除按名称索引的服务器缓存
+            self.__dict__.pop('_servers_by_name', None)
+            
+            # 读取配置文件（优先使用解析缓存，每次反序列化得到独立的副本）
             console.print(f"[blue]✲ 正在加载配置文件:[/blue] {self.config_path}")
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                self.config = yaml.safe_load(f)
+            st = os.stat(self.config_path)
+            snapshot = _load_config_snapshot(self.config_path, st.st_mtime_ns, st.st_size)
+            self.config = pickle.loads(snapshot) if snapshot is not None else None
             
             # 检查配置是否为空
             if self.config is None:
@@ -194,7 +321,11 @@ class ConfigManager:
             console.print("[green]✓ 配置文件加载成功[/green]")
             
             # 验证配置
-            return self.validate_config()
+            if not self.validate_config():
+                return False
+            
+            self._build_server_indexes()
+            return True
             
         except yaml.YAMLError as e:
             log_error(f"配置文件格式错误: {e}")
@@ -203,6 +334,21 @@ class ConfigManager:
             log_error(f"加载配置文件失败: {e}")
             return False
     
+    def _build_server_indexes(self):
+        """
+        为每个服务器预先计算选择界面使用的索引（在验证通过后调用，单独保存，不写入配置数据）
+        
+        上传索引: ((应用类型, 任务数量), ...)
+        命令索引: ((命令组, 命令列表), ...)
+        """
+        self._server_indexes = {
+            server['name']: (
+                tuple((upload_type, len(items)) for upload_type, items in server.get('upload', {}).items()),
+                tuple(server.get('commands', {}).items()),
+            )
+            for server in self.get_servers()
+        }
+    
     def validate_config(self) -> bool:
         """
         验证配置的合法性
@@ -290,6 +436,20 @@ class ConfigManager:
             log_error(f"服务器 '{server['name']}' 的端口号无效: {server['port']} (必须在 1-65535 之间)")
             return False
         
+        # 验证上传并发数（可选）
+        if 'upload_parallelism' in server:
+            parallelism = server['upload_parallelism']
+            if not isinstance(parallelism, int) or isinstance(parallelism, bool) or parallelism < 1:
+                log_error(f"服务器 '{server['name']}' 的 'upload_parallelism' 必须是正整数")
+                return False
+        
+        # 验证远程命令超时时间（可选）
+        if 'command_timeout' in server:
+            timeout = server['command_timeout']
+            if not isinstance(timeout, (int, float)) or isinstance(timeout, bool) or timeout <= 0:
+                log_error(f"服务器 '{server['name']}' 的 'command_timeout' 必须是正数（秒）")
+                return False
+        
         # 验证认证配置
         if not self._validate_auth_config(server['auth'], server['name']):
             return False
@@ -303,6 +463,15 @@ class ConfigManager:
             if not self._validate_upload_config(server['upload'], server['name']):
                 return False
         
+        # 验证本地命令配置（可选）
+        if 'local_commands' in server:
+            if not isinstance(server['local_commands'], dict):
+                log_error(f"服务器 '{server['name']}' 的 'local_commands' 必须是字典类型")
+                return False
+            
+            if not self._validate_local_commands_config(server['local_commands'], server['name']):
+                return False
+        
         # 验证命令配置（可选）
         if 'commands' in server:
             if not isinstance(server['commands'], dict):
@@ -398,6 +567,59 @@ class ConfigManager:
                     if not isinstance(item['delete_extra'], bool):
                         log_error(f"服务器 '{server_name}' 的 'delete_extra' 必须是布尔类型")
                         return False
+                
+                # 验证 verify（可选）
+                if 'verify' in item:
+                    if not isinstance(item['verify'], bool):
+                        log_error(f"服务器 '{server_name}' 的 'verify' 必须是布尔类型")
+                        return False
+                
+                # 验证传输方式（可选）
+                if 'transfer' in item:
+                    if item['transfer'] not in ['sftp', 'tar']:
+                        log_error(f"服务器 '{server_name}' 的传输方式无效: {item['transfer']} (支持: sftp, tar)")
+                        return False
+        
+        return True
+    
+    def _validate_local_commands_config(self, local_commands: Dict[str, Any], server_name: str) -> bool:
+        """
+        验证本地命令配置
+        
+        Args:
+            local_commands: 本地命令配置
+            server_name: 服务器名称
+            
+        Returns:
+            bool: 验证是否通过
+        """
+        for upload_type, config in local_commands.items():
+            if not isinstance(config, dict):
+                log_error(f"服务器 '{server_name}' 的本地命令 '{upload_type}' 必须是字典类型")
+                return False
+            
+            # 验证 parallel_groups（可选）：列表的列表，组内为字符串命令
+            parallel_groups = config.get('parallel_groups')
+            if parallel_groups is not None:
+                if not isinstance(parallel_groups, list):
+                    log_error(f"服务器 '{server_name}' 的本地命令 '{upload_type}' 的 'parallel_groups' 必须是列表")
+                    return False
+                
+                for idx, group in enumerate(parallel_groups):
+                    if not isinstance(group, list) or not all(isinstance(cmd, str) for cmd in group):
+                        log_error(f"服务器 '{server_name}' 的本地命令 '{upload_type}' 的并行组第 {idx} 项必须是字符串列表")
+                        return False
+            
+            # 验证 parallel / max_concurrency（可选）
+            if 'parallel' in config and not isinstance(config['parallel'], bool):
+                log_error(f"服务器 '{server_name}' 的本地命令 '{upload_type}' 的 'parallel' 必须是布尔类型")
+                return False
+            
+            if 'max_concurrency' in config:
+                max_concurrency = config['max_concurrency']
+                if not isinstance(max_concurrency, int) or isinstance(max_concurrency, bool) or max_concurrency < 1:
+                    log_error(f"服务器 '{server_name}' 的本地命令 '{upload_type}' 的 'max_concurrency' 必须是正整数")
+                    return False
         
         return True
     
@@ -418,8 +640,11 @@ class ConfigManager:
                 return False
             
             for idx, command in enumerate(command_list):
+                # 子列表表示一批可并行执行的命令
+                if isinstance(command, list) and command and all(isinstance(c, str) for c in command):
+                    continue
                 if not isinstance(command, str):
-                    log_error(f"服务器 '{server_name}' 的命令组 '{command_group}' 的第 {idx} 项必须是字符串")
+                    log_error(f"服务器 '{server_name}' 的命令组 '{command_group}' 的第 {idx} 项必须是字符串或字符串列表")
                     return False
         
         return True
@@ -443,10 +668,24 @@ class ConfigManager:
         Returns:
             Optional[Dict]: 服务器配置，如果未找到则返回 None
         """
-        for server in self.get_servers():
-            if server['name'] == name:
-                return server
-        return None
+        return self._servers_by_name.get(name)
+    
+    def get_server_indexes(self, name: str) -> Optional[Tuple[tuple, tuple]]:
+        """
+        获取服务器的选择界面索引
+        
+        Args:
+            name: 服务器名称
+            
+        Returns:
+            Optional[Tuple[tuple, tuple]]: (上传索引, 命令索引)，未加载或未找到时返回 None
+        """
+        return self._server_indexes.get(name)
+    
+    @cached_property
+    def _servers_by_name(self) -> Dict[str, Dict[str, Any]]:
+        """按名称索引的服务器配置（首次访问时构建，load_config 时失效）"""
+        return {server['name']: server for server in self.get_servers()}
     
     def get_license_key(self) -> Optional[str]:
         """
@@ -471,6 +710,23 @@ class ConfigManager:
         return expand_path(path)
 
 
+def load_config_manager(config_path: Optional[str] = None) -> Optional[ConfigManager]:
+    """
+    创建配置管理器并加载、验证配置
+    
+    每次调用都返回新的配置管理器（配置为解析缓存的独立副本，调用方修改不会影响其他调用方）；
+    YAML 解析结果由 _load_config_snapshot 按 (路径, mtime, size) 缓存，配置文件未修改时不再重新解析。
+    
+    Args:
+        config_path: 配置文件路径（可选，默认使用用户配置文件）
+        
+    Returns:
+        Optional[ConfigManager]: 配置管理器，配置文件不存在或验证失败时返回 None
+    """
+    config_manager = ConfigManager(config_path)
+    return config_manager if config_manager.load_config() else None
+
+
 def main():
     """主函数 - 用于测试配置管理器"""
     import sys
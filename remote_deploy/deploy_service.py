@@ -6,31 +6,194 @@
 负责控制整个部署流程
 """
 
+import io
 import os
+import re
 import sys
 import time
+import queue
 import signal
 import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any
-from common.ssh_client import SSHClient
-from common.log_utils import log_error
+from typing import Optional, Dict, List, Any, Tuple, Callable, TextIO, TYPE_CHECKING
 from remote_deploy.config_manager import ConfigManager
-from remote_deploy.file_uploader import FileUploader
-from remote_deploy.command_executor import CommandExecutor
-from remote_deploy.local_command_executor import LocalCommandExecutor
-from remote_deploy.validate_config import show_servers_table
-from remote_deploy.license_validator import LicenseValidator
 from rich.console import Console, Group
 from rich.panel import Panel
 from rich.table import Table
+from rich.text import Text
 from rich.prompt import Prompt
-from rich.progress import Progress, BarColumn, TextColumn, TimeRemainingColumn
-from rich.live import Live
 from rich import box
 
+# 执行部署时才需要的模块在使用处延迟导入（LicenseValidator 会加载 requests 等较重的依赖）
+if TYPE_CHECKING:
+    from common.ssh_client import SSHClient
+    from remote_deploy.file_uploader import FileUploader
+    from remote_deploy.command_executor import CommandExecutor
+    from remote_deploy.local_command_executor import LocalCommandExecutor
+
 console = Console()
 
+# 后台任务线程池（如倒计时期间的授权验证）
+_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+# 设置 DA_SONG_GE_KEEP_SSH 时部署结束后不断开 SSH 连接，同一进程内的后续部署直接复用，进程退出时统一关闭
+_KEEP_SSH = bool(os.getenv('DA_SONG_GE_KEEP_SSH'))
+_ssh_cleanup_registered = False
+
+
+def _release_ssh_client(ssh_client: 'SSHClient'):
+    """
+    部署结束时释放 SSH 连接（保留模式下改为在进程退出时关闭）
+    
+    Args:
+        ssh_client: SSH 客户端实例
+    """
+    global _ssh_cleanup_registered
+    if not _KEEP_SSH:
+        ssh_client.disconnect()
+        return
+    if not _ssh_cleanup_registered:
+        import atexit
+        atexit.register(ssh_client.disconnect)
+        _ssh_cleanup_registered = True
+
+# 多选输入的分隔符统一转换为英文逗号（中文逗号、空格、制表符）
+_SEP_TABLE = str.maketrans({'，': ',', ' ': ',', '\t': ','})
+_SPLIT_RE = re.compile(r',+')
+
+# 选择界面表格的公共样式参数
+_TABLE_KWARGS = dict(
+    box=box.ROUNDED,
+    border_style="bright_blue",
+    show_header=True,
+    header_style="bold cyan",
+)
+
+
+# 空行（与 Panel 组合后一次性渲染）
+_BLANK = Text("")
+
+# 非终端输出（CI、管道）时跳过面板布局，只输出纯文本行
+_IS_TTY = sys.stdout.isatty()
+
+
+def _panel(body: str, border_style: str = "blue", title: Optional[str] = None):
+    """
+    构建面板（非终端输出时退化为纯文本行，省去面板布局计算）
+    
+    Args:
+        body: 面板内容（Rich 标记）
+        border_style: 边框样式
+        title: 面板标题
+        
+    Returns:
+        Panel 或 Text
+    """
+    if not _IS_TTY:
+        plain = Text.from_markup(body).plain
+        return Text(f"[{title}] {plain}" if title else plain)
+    return Panel.fit(body, border_style=border_style, title=title)
+
+
+def _stage_panel(body: str, title: str, border_style: str = "blue") -> Group:
+    """
+    构建前后各带一个空行的阶段标题面板
+    
+    Args:
+        body: 面板内容
+        title: 面板标题
+        border_style: 边框样式
+        
+    Returns:
+        Group: 可直接交给 console.print 的渲染组
+    """
+    return Group(_BLANK, _panel(body, border_style, title), _BLANK)
+
+def _format_command(command: Any) -> str:
+    """
+    格式化命令用于显示（子列表为并行批次）
+    
+    Args:
+        command: 命令字符串或并行命令列表
+        
+    Returns:
+        str: 显示文本
+    """
+    if isinstance(command, list):
+        return "并行: " + " | ".join(command)
+    return command
+
+
+# 固定延迟的定时选项: {选项: (延迟秒数, 表格说明, 选中提示)}
+_STATIC_SCHEDULE = {
+    "0": (0, "立即执行（默认）", "[green]✓ 将立即执行部署[/green]"),
+    "1": (60, "1分钟后执行", "[green]✓ 将在 1 分钟后执行[/green]"),
+    "2": (300, "5分钟后执行", "[green]✓ 将在 5 分钟后执行[/green]"),
+    "3": (1800, "30分钟后执行", "[green]✓ 将在 30 分钟后执行[/green]"),
+    "4": (3600, "1小时后执行", "[green]✓ 将在 1 小时后执行[/green]"),
+}
+
+# 倒计时进度条长度及预渲染的全部状态（下标为已完成格数）
+_COUNTDOWN_BAR_LENGTH = 50
+_COUNTDOWN_BARS = tuple(
+    f"[bold green]{'█' * i}[/bold green][grey62]{'░' * (_COUNTDOWN_BAR_LENGTH - i)}[/grey62]"
+    for i in range(_COUNTDOWN_BAR_LENGTH + 1)
+)
+
+# 目标时间支持的格式: (格式, 类型)
+_TARGET_TIME_FORMATS = (
+    ("%H:%M", "今天"),
+    ("%H:%M:%S", "今天"),
+    ("%m-%d %H:%M", "今年"),
+    ("%Y-%m-%d %H:%M:%S", "完整"),
+    ("%Y-%m-%d %H:%M", "完整"),
+)
+
+# 按输入长度预选格式（补零的标准写法），未命中时再逐个尝试全部格式
+_TARGET_TIME_FORMAT_BY_LEN = {
+    5: _TARGET_TIME_FORMATS[0],
+    8: _TARGET_TIME_FORMATS[1],
+    11: _TARGET_TIME_FORMATS[2],
+    19: _TARGET_TIME_FORMATS[3],
+    16: _TARGET_TIME_FORMATS[4],
+}
+
+# 已解析的时间字符串: {time_str: (解析结果, 格式, 类型)}
+_parsed_time_cache: Dict[str, Tuple[datetime, str, str]] = {}
+
+
+def _strptime_target(time_str: str) -> Optional[Tuple[datetime, str, str]]:
+    """
+    按支持的格式解析目标时间字符串
+    
+    Args:
+        time_str: 用户输入的时间字符串
+        
+    Returns:
+        Optional[Tuple[datetime, str, str]]: (解析结果, 格式, 类型)，无法解析时返回 None
+    """
+    cached = _parsed_time_cache.get(time_str)
+    if cached is not None:
+        return cached
+    
+    candidates = _TARGET_TIME_FORMATS
+    hit = _TARGET_TIME_FORMAT_BY_LEN.get(len(time_str))
+    if hit is not None:
+        candidates = (hit,) + tuple(f for f in _TARGET_TIME_FORMATS if f is not hit)
+    
+    for fmt, time_type in candidates:
+        try:
+            parsed = datetime.strptime(time_str, fmt)
+        except ValueError:
+            continue
+        result = (parsed, fmt, time_type)
+        _parsed_time_cache[time_str] = result
+        return result
+    
+    return None
+
 
 class TimeoutInput:
     """跨平台的超时输入辅助类"""
@@ -61,6 +224,9 @@ class TimeoutInput:
         """
         带超时的输入提示（跨平台）
         
+        POSIX 终端下直接用 selectors 等待 stdin 可读；其他平台（如 Windows
+        不支持对 stdin 使用 select）回退到输入线程方式。
+        
         Args:
             prompt_text: 提示文本
             default: 默认值
@@ -68,6 +234,9 @@ class TimeoutInput:
         Returns:
             Optional[str]: 用户输入或默认值，None 表示超时
         """
+        if os.name == 'posix' and sys.stdin.isatty():
+            return self._prompt_with_selector(prompt_text, default)
+        
         # 在单独的线程中执行输入操作
         self.input_thread = threading.Thread(
             target=self._input_thread_func,
@@ -87,6 +256,38 @@ class TimeoutInput:
             self.input_received = True
             return None
     
+    def _prompt_with_selector(self, prompt_text: str, default: str) -> Optional[str]:
+        """
+        POSIX 下基于 selectors 的超时输入（无需额外线程，超时后不会残留读取 stdin 的提示）
+        
+        Args:
+            prompt_text: 提示文本
+            default: 默认值
+            
+        Returns:
+            Optional[str]: 用户输入或默认值，None 表示超时
+        """
+        import selectors
+        
+        console.print(f"{prompt_text} [bold cyan]({default})[/bold cyan]: ", end="")
+        
+        with selectors.DefaultSelector() as selector:
+            selector.register(sys.stdin, selectors.EVENT_READ)
+            events = selector.select(self.timeout_seconds)
+        
+        if not events:
+            self.input_received = True
+            return None
+        
+        line = sys.stdin.readline()
+        if not line:
+            # stdin 已关闭（EOF），与 Prompt.ask 行为一致
+            raise EOFError
+        
+        self.user_input = line.strip() or default
+        self.input_received = True
+        return self.user_input
+    
     def is_timed_out(self) -> bool:
         """检查是否超时"""
         return not self.input_received or self.user_input is None
@@ -103,17 +304,26 @@ class RemoteDeployService:
             config_manager: 配置管理器实例
         """
         self.config_manager = config_manager
-        self.ssh_client: Optional[SSHClient] = None
-        self.file_uploader: Optional[FileUploader] = None
-        self.command_executor: Optional[CommandExecutor] = None
-        self.local_command_executor: Optional[LocalCommandExecutor] = None
+        self.ssh_client: Optional['SSHClient'] = None
+        self.file_uploader: Optional['FileUploader'] = None
+        self.command_executor: Optional['CommandExecutor'] = None
+        self.local_command_executor: Optional['LocalCommandExecutor'] = None
+        # 按工作目录缓存的本地命令执行器
+        self._local_executors: Dict[Optional[str], 'LocalCommandExecutor'] = {}
+        # 倒计时取消事件（Ctrl+C 时置位，立即结束等待）
+        self._cancel = threading.Event()
+        # 倒计时中止事件（与 _cancel 同时置位，表示放弃部署而非立即执行）
+        self._abort = threading.Event()
+        # 按应用类型并发执行时，串行化工作线程中的控制台输出
+        self._console_lock = threading.Lock()
     
     @staticmethod
     def deploy(config_path: Optional[str] = None, 
                server_name: Optional[str] = None,
                upload_types: Optional[List[str]] = None,
                command_group: Optional[List[str]] = None,
-               dry_run: bool = False) -> bool:
+               dry_run: bool = False,
+               dry_run_format: str = 'rich') -> bool:
         """
         部署入口方法
         
@@ -123,16 +333,40 @@ class RemoteDeployService:
             upload_types: 应用类型列表（可选，支持多个）
             command_group: 命令组列表（可选，支持多个）
             dry_run: 是否模拟执行
+            dry_run_format: 模拟执行输出格式（rich: 终端表格，json: 机器可读的部署计划）
             
         Returns:
             bool: 部署是否成功
         """
-        console.clear()
-        console.print(Panel.fit(
-            "[bold yellow]远程服务器部署工具[/bold yellow]",
-            border_style="magenta",
-            title="🚀 部署工具"
-        ))
+        args = (config_path, server_name, upload_types, command_group, dry_run, dry_run_format)
+        if not (dry_run and dry_run_format == 'json'):
+            return RemoteDeployService._run_deploy(*args)
+        
+        # JSON 模式下标准输出只包含部署计划：其余输出（包括各模块的 Rich 控制台）全部转到标准错误
+        plan_stream = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            return RemoteDeployService._run_deploy(*args, plan_stream=plan_stream)
+    
+    @staticmethod
+    def _run_deploy(config_path: Optional[str], server_name: Optional[str],
+                    upload_types: Optional[List[str]], command_group: Optional[List[str]],
+                    dry_run: bool, dry_run_format: str, plan_stream: Optional[TextIO] = None) -> bool:
+        """
+        部署流程（参数同 deploy）
+        
+        Args:
+            plan_stream: JSON 部署计划的输出流（仅 JSON 模拟执行时传入，此时不清屏、不询问定时部署）
+            
+        Returns:
+            bool: 部署是否成功
+        """
+        if plan_stream is None:
+            console.clear()
+            console.print(Panel.fit(
+                "[bold yellow]远程服务器部署工具[/bold yellow]",
+                border_style="magenta",
+                title="🚀 部署工具"
+            ))
         
         # 加载配置（如果没有指定配置文件，ConfigManager 会使用用户配置文件）
         config_manager = ConfigManager(config_path)
@@ -191,8 +425,8 @@ class RemoteDeployService:
             ))
             return False
         
-        # 选择定时部署
-        delay_seconds = service._select_schedule_time_interactive()
+        # 选择定时部署（输出 JSON 部署计划时视为立即执行）
+        delay_seconds = 0 if plan_stream is not None else service._select_schedule_time_interactive()
         if delay_seconds is None:
             # 用户取消操作
             console.print(Panel.fit(
@@ -203,15 +437,17 @@ class RemoteDeployService:
         
         # 模拟执行
         if dry_run:
-            console.print(Panel.fit(
-                "[bold yellow]模拟执行模式（不会实际执行）[/bold yellow]",
-                border_style="yellow",
-                title="🔍 模拟执行"
-            ))
-            service._show_dry_run_info(server_config, upload_types, command_group)
+            if dry_run_format != 'json':
+                console.print(Panel.fit(
+                    "[bold yellow]模拟执行模式（不会实际执行）[/bold yellow]",
+                    border_style="yellow",
+                    title="🔍 模拟执行"
+                ))
+            service._show_dry_run_info(server_config, upload_types, command_group, dry_run_format,
+                                       plan_stream)
             return True
         
-        # 验证授权密钥（在选择定时之后、倒计时之前）
+        # 验证授权密钥（在选择定时之后）
         license_key = config_manager.get_license_key()
         if not license_key:
             console.print(Panel.fit(
@@ -220,19 +456,34 @@ class RemoteDeployService:
             ))
             return False
         
+        from remote_deploy.license_validator import LicenseValidator
         validator = LicenseValidator(license_key)
-        success, data, error_msg = validator.validate()
-        
-        if not success:
-            validator.show_error(error_msg, data)
-            return False
-        
-        # 显示授权信息
-        validator.show_license_info(data)
         
-        # 如果设置了延迟，进行倒计时等待
         if delay_seconds > 0:
-            service._countdown_wait(delay_seconds, server_config, upload_types, command_group)
+            # 定时部署：授权验证在后台进行，网络耗时隐藏在倒计时中；验证失败时中止倒计时
+            future = _EXECUTOR.submit(validator.validate)
+            future.add_done_callback(lambda f: service._abort_countdown() if not f.result()[0] else None)
+            
+            proceed = service._countdown_wait(delay_seconds, server_config, upload_types, command_group)
+            success, data, error_msg = future.result()
+            
+            if not success:
+                validator.show_error(error_msg, data)
+                return False
+            
+            validator.show_license_info(data)
+            
+            if not proceed:
+                return False
+        else:
+            success, data, error_msg = validator.validate()
+            
+            if not success:
+                validator.show_error(error_msg, data)
+                return False
+            
+            # 显示授权信息
+            validator.show_license_info(data)
         
         # 执行部署
         return service._execute_deployment(server_config, upload_types, command_group)
@@ -248,15 +499,23 @@ class RemoteDeployService:
         ))
         
         # 使用 validate_config 中的表格显示函数
+        from remote_deploy.validate_config import show_servers_table
         show_servers_table(servers, title=None)
         
         try:
-            choice = Prompt.ask(
-                "[bold cyan]请选择服务器编号[/bold cyan]",
-                choices=[str(i) for i in range(1, len(servers) + 1)]
-            )
+            # 自行校验编号范围，避免为 Prompt 构建 choices 列表
+            while True:
+                choice = Prompt.ask("[bold cyan]请选择服务器编号[/bold cyan]")
+                try:
+                    idx = int(choice.strip()) - 1
+                except ValueError:
+                    idx = -1
+                
+                if 0 <= idx < len(servers):
+                    break
+                
+                console.print(f"[red]❌ 请输入 1-{len(servers)} 之间的编号[/red]")
             
-            idx = int(choice) - 1
             selected = servers[idx]['name']
             console.print(f"[green]✓ 已选择服务器:[/green] [bold]{selected}[/bold]")
             console.print()
@@ -277,7 +536,12 @@ class RemoteDeployService:
             ))
             return None
         
-        upload_types = list(upload_config.keys())
+        # 优先使用加载配置时预先计算的 (应用类型, 任务数量) 索引
+        indexes = self.config_manager.get_server_indexes(server_config['name'])
+        upload_index = indexes[0] if indexes else tuple(
+            (upload_type, len(items)) for upload_type, items in upload_config.items()
+        )
+        upload_types = [upload_type for upload_type, _ in upload_index]
         
         console.print(Panel.fit(
             "[bold yellow]可选应用类型（支持多选）[/bold yellow]",
@@ -286,20 +550,13 @@ class RemoteDeployService:
         ))
         
         # 创建应用类型表格
-        table = Table(
-            box=box.ROUNDED,
-            border_style="bright_blue",
-            show_header=True,
-            header_style="bold cyan",
-            # show_lines=True
-        )
+        table = Table(**_TABLE_KWARGS)
         
         table.add_column("序号", justify="center", style="bold yellow", width=4, vertical="middle")
         table.add_column("应用类型", style="bold green", width=20, vertical="middle")
         table.add_column("任务数量", style="cyan", width=10, vertical="middle")
         
-        for idx, upload_type in enumerate(upload_types, 1):
-            file_count = len(upload_config[upload_type])
+        for idx, (upload_type, file_count) in enumerate(upload_index, 1):
             table.add_row(
                 str(idx),
                 upload_type,
@@ -320,69 +577,13 @@ class RemoteDeployService:
         
         console.print(table)
         
-        # 循环直到用户输入有效选择或取消
-        while True:
-            try:
-                console.print(f"[green]用逗号或空格分隔，如: 1,2 或 1 2 或输入 a 全选:[/green]")
-                choice = Prompt.ask(
-                    "[bold cyan]请选择应用类型编号[/bold cyan]"
-                )
-                
-                # 处理跳过
-                if choice.strip() == '0':
-                    console.print("[yellow]⚠ 已跳过文件上传[/yellow]")
-                    return None
-                
-                # 处理全选
-                if choice.strip().lower() == 'a':
-                    console.print(f"[green]✓ 已选择部署应用:[/green] [bold]{', '.join(upload_types)}[/bold]")
-                    return upload_types
-                
-                # 统一处理中英文逗号和空格分隔符
-                # 将中文逗号替换为英文逗号，然后同时按逗号和空格分割
-                choice = choice.replace('，', ',')  # 中文逗号转英文逗号
-                # 先按逗号分割，再对每部分按空格分割
-                parts = []
-                for segment in choice.split(','):
-                    parts.extend(segment.split())
-                
-                # 处理多选
-                selected_indices = []
-                invalid_inputs = []
-                
-                for part in parts:
-                    part = part.strip()
-                    if not part:
-                        continue
-                    try:
-                        idx = int(part)
-                        if 1 <= idx <= len(upload_types):
-                            selected_indices.append(idx)
-                        else:
-                            invalid_inputs.append(part)
-                    except ValueError:
-                        invalid_inputs.append(part)
-                
-                # 显示无效输入警告
-                if invalid_inputs:
-                    console.print(f"[yellow]⚠ 忽略无效输入: {', '.join(invalid_inputs)}[/yellow]")
-                
-                # 如果没有有效选择，提示重新输入
-                if not selected_indices:
-                    console.print("[red]❌ 未选择有效的应用类型，请重新输入[/red]")
-                    console.print()
-                    continue
-                
-                # 去重并排序
-                selected_indices = sorted(set(selected_indices))
-                selected_types = [upload_types[idx - 1] for idx in selected_indices]
-                
-                console.print(f"[green]✓ 已选择部署应用:[/green] [bold]{', '.join(selected_types)}[/bold]")
-                return selected_types
-                    
-            except KeyboardInterrupt:
-                console.print("\n[yellow]⚠ 操作已取消[/yellow]")
-                return None
+        return self._prompt_multi_choice(
+            upload_types,
+            prompt_text="请选择应用类型编号",
+            skip_message="已跳过文件上传",
+            selected_label="已选择部署应用",
+            empty_message="未选择有效的应用类型"
+        )
     
     def _select_command_group_interactive(self, server_config: Dict[str, Any]) -> Optional[List[str]]:
         """交互式选择命令组（支持多选）"""
@@ -395,7 +596,10 @@ class RemoteDeployService:
             ))
             return None
         
-        command_groups = list(commands_config.keys())
+        # 优先使用加载配置时预先计算的 (命令组, 命令列表) 索引
+        indexes = self.config_manager.get_server_indexes(server_config['name'])
+        commands_index = indexes[1] if indexes else tuple(commands_config.items())
+        command_groups = [group for group, _ in commands_index]
         
         console.print()
         console.print(Panel.fit(
@@ -405,22 +609,15 @@ class RemoteDeployService:
         ))
         
         # 创建命令组表格
-        table = Table(
-            box=box.ROUNDED,
-            border_style="bright_blue",
-            show_header=True,
-            header_style="bold cyan",
-            show_lines=True
-        )
+        table = Table(**_TABLE_KWARGS, show_lines=True)
         
         table.add_column("序号", justify="center", style="bold yellow", width=4, vertical="middle")
         table.add_column("命令组", style="bold green", width=16, vertical="middle")
         table.add_column("命令语句", style="cyan", width=60, vertical="middle")
         
-        for idx, group in enumerate(command_groups, 1):
-            commands = commands_config[group]
+        for idx, (group, commands) in enumerate(commands_index, 1):
             # 显示命令语句，每条命令一行
-            cmd_display = "\n".join([f"• {cmd}" for cmd in commands])
+            cmd_display = "\n".join("• " + _format_command(cmd) for cmd in commands)
             table.add_row(
                 str(idx),
                 group,
@@ -440,42 +637,58 @@ class RemoteDeployService:
         )
         console.print(table)
         
+        return self._prompt_multi_choice(
+            command_groups,
+            prompt_text="请选择命令组编号",
+            skip_message="已跳过命令执行",
+            selected_label="已选择执行命令组",
+            empty_message="未选择有效的命令组"
+        )
+    
+    def _prompt_multi_choice(self, items: List[str], prompt_text: str, skip_message: str,
+                             selected_label: str, empty_message: str) -> Optional[List[str]]:
+        """
+        多选输入循环（选项表格由调用方先行显示）
+        
+        支持中英文逗号和空格分隔的编号，a 表示全选，0 表示跳过。
+        
+        Args:
+            items: 可选项列表（编号从 1 开始）
+            prompt_text: 输入提示
+            skip_message: 选择跳过时的提示
+            selected_label: 选择成功时的提示前缀
+            empty_message: 没有有效选择时的提示
+            
+        Returns:
+            Optional[List[str]]: 选中的项，None 表示跳过或取消
+        """
         # 循环直到用户输入有效选择或取消
         while True:
             try:
                 console.print(f"[green]用逗号或空格分隔，如: 1,2 或 1 2 或输入 a 全选:[/green]")
-                choice = Prompt.ask(
-                    "[bold cyan]请选择应用类型编号[/bold cyan]"
-                )
+                choice = Prompt.ask(f"[bold cyan]{prompt_text}[/bold cyan]")
                 
                 # 处理跳过
                 if choice.strip() == '0':
-                    console.print("[yellow]⚠ 已跳过命令执行[/yellow]")
+                    console.print(f"[yellow]⚠ {skip_message}[/yellow]")
                     return None
                 
                 # 处理全选
                 if choice.strip().lower() == 'a':
-                    console.print(f"[green]✓ 已选择执行命令组:[/green] [bold]{', '.join(command_groups)}[/bold]")
-                    return command_groups
+                    console.print(f"[green]✓ {selected_label}:[/green] [bold]{', '.join(items)}[/bold]")
+                    return items
                 
-                # 统一处理中英文逗号和空格分隔符
-                choice = choice.replace('，', ',')  # 中文逗号转英文逗号
-                # 先按逗号分割，再对每部分按空格分割
-                parts = []
-                for segment in choice.split(','):
-                    parts.extend(segment.split())
+                # 统一处理中英文逗号和空格分隔符：一次转换后按逗号分割
+                parts = [part for part in _SPLIT_RE.split(choice.translate(_SEP_TABLE).strip(',')) if part]
                 
                 # 处理多选
                 selected_indices = []
                 invalid_inputs = []
                 
                 for part in parts:
-                    part = part.strip()
-                    if not part:
-                        continue
                     try:
                         idx = int(part)
-                        if 1 <= idx <= len(command_groups):
+                        if 1 <= idx <= len(items):
                             selected_indices.append(idx)
                         else:
                             invalid_inputs.append(part)
@@ -488,16 +701,16 @@ class RemoteDeployService:
                 
                 # 如果没有有效选择，提示重新输入
                 if not selected_indices:
-                    console.print("[red]❌ 未选择有效的命令组，请重新输入[/red]")
+                    console.print(f"[red]❌ {empty_message}，请重新输入[/red]")
                     console.print()
                     continue
                 
-                # 去重并排序
-                selected_indices = sorted(set(selected_indices))
-                selected_groups = [command_groups[idx - 1] for idx in selected_indices]
+                # 去重并保持输入顺序（部署按用户输入的顺序执行）
+                selected_indices = list(dict.fromkeys(selected_indices))
+                selected = [items[idx - 1] for idx in selected_indices]
                 
-                console.print(f"[green]✓ 已选择执行命令组:[/green] [bold]{', '.join(selected_groups)}[/bold]")
-                return selected_groups
+                console.print(f"[green]✓ {selected_label}:[/green] [bold]{', '.join(selected)}[/bold]")
+                return selected
                     
             except KeyboardInterrupt:
                 console.print("\n[yellow]⚠ 操作已取消[/yellow]")
@@ -510,39 +723,21 @@ class RemoteDeployService:
         Returns:
             Optional[int]: 延迟秒数，0表示立即执行，None表示用户取消
         """
-        console.print()
-        console.print(Panel.fit(
-            "[bold yellow]是否需要定时部署？[/bold yellow]",
-            border_style="magenta",
-            title="⏰ 定时部署"
-        ))
-        console.print()
+        console.print(_stage_panel("[bold yellow]是否需要定时部署？[/bold yellow]", "⏰ 定时部署", "magenta"))
         
-        # 计算次日凌晨3点和5点的时间
-        now = datetime.now()
-        tomorrow = now + timedelta(days=1)
-        tomorrow_3am = tomorrow.replace(hour=3, minute=0, second=0, microsecond=0)
-        tomorrow_5am = tomorrow.replace(hour=5, minute=0, second=0, microsecond=0)
+        # 次日日期仅用于显示，具体延迟在选中时再计算
+        tomorrow_date = (datetime.now() + timedelta(days=1)).date()
         
         # 创建定时选项表格
-        table = Table(
-            box=box.ROUNDED,
-            border_style="bright_blue",
-            show_header=True,
-            header_style="bold cyan",
-            # show_lines=True
-        )
+        table = Table(**_TABLE_KWARGS)
         
         table.add_column("选项", justify="center", style="bold yellow", width=6, vertical="middle")
         table.add_column("说明", style="bold green", width=50, vertical="middle")
         
-        table.add_row("0", "立即执行（默认）")
-        table.add_row("1", "1分钟后执行")
-        table.add_row("2", "5分钟后执行")
-        table.add_row("3", "30分钟后执行")
-        table.add_row("4", "1小时后执行")
-        table.add_row("5", f"次日凌晨 03:00 执行 ({tomorrow_3am.strftime('%Y-%m-%d %H:%M:%S')})")
-        table.add_row("6", f"次日凌晨 05:00 执行 ({tomorrow_5am.strftime('%Y-%m-%d %H:%M:%S')})")
+        for option, (_, description, _) in _STATIC_SCHEDULE.items():
+            table.add_row(option, description)
+        table.add_row("5", f"次日凌晨 03:00 执行 ({tomorrow_date} 03:00:00)")
+        table.add_row("6", f"次日凌晨 05:00 执行 ({tomorrow_date} 05:00:00)")
         table.add_row("7", "自定义延迟时间（分钟）")
         table.add_row("8", "自定义目标时间（日期时间）")
         
@@ -553,69 +748,76 @@ class RemoteDeployService:
         console.print("[dim]💡 提示: 60秒内未输入将自动选择立即执行[/dim]")
         console.print()
         
+        # 表格只显示一次，输入无效时仅重新提示
         try:
-            # 使用跨平台的超时输入（60秒超时）
-            timeout_input = TimeoutInput(timeout_seconds=60)
-            choice = timeout_input.prompt_with_timeout(
-                "[bold cyan]请选择定时选项[/bold cyan]",
-                default="0"
-            )
-            
-            # 检查是否超时
-            if choice is None:
-                console.print("\n[yellow]⚠ 输入超时（60秒），将立即执行部署[/yellow]")
-                return 0
-            
-            choice = choice.strip()
-            
-            # 处理选项
-            if choice == "0":
-                console.print("[green]✓ 将立即执行部署[/green]")
-                return 0
-            elif choice == "1":
-                console.print("[green]✓ 将在 1 分钟后执行[/green]")
-                return 60
-            elif choice == "2":
-                console.print("[green]✓ 将在 5 分钟后执行[/green]")
-                return 300
-            elif choice == "3":
-                console.print("[green]✓ 将在 30 分钟后执行[/green]")
-                return 1800
-            elif choice == "4":
-                console.print("[green]✓ 将在 1 小时后执行[/green]")
-                return 3600
-            elif choice == "5":
-                delay = int((tomorrow_3am - now).total_seconds())
-                if delay <= 0:
-                    console.print("[red]❌ 目标时间已过期[/red]")
-                    return self._select_schedule_time_interactive()
-                hours = delay // 3600
-                minutes = (delay % 3600) // 60
-                console.print(f"[green]✓ 将在次日凌晨 03:00 执行（{hours}小时{minutes}分钟后）[/green]")
-                return delay
-            elif choice == "6":
-                delay = int((tomorrow_5am - now).total_seconds())
-                if delay <= 0:
-                    console.print("[red]❌ 目标时间已过期[/red]")
-                    return self._select_schedule_time_interactive()
-                hours = delay // 3600
-                minutes = (delay % 3600) // 60
-                console.print(f"[green]✓ 将在次日凌晨 05:00 执行（{hours}小时{minutes}分钟后）[/green]")
-                return delay
-            elif choice == "7":
-                return self._parse_custom_delay()
-            elif choice == "8":
-                return self._parse_target_datetime()
-            else:
-                console.print(f"[red]❌ 无效的选项: {choice}[/red]")
-                return self._select_schedule_time_interactive()
+            while True:
+                try:
+                    # 使用跨平台的超时输入（60秒超时）
+                    timeout_input = TimeoutInput(timeout_seconds=60)
+                    choice = timeout_input.prompt_with_timeout(
+                        "[bold cyan]请选择定时选项[/bold cyan]",
+                        default="0"
+                    )
+                    
+                    # 检查是否超时
+                    if choice is None:
+                        console.print("\n[yellow]⚠ 输入超时（60秒），将立即执行部署[/yellow]")
+                        return 0
+                    
+                    choice = choice.strip()
+                    
+                    # 固定延迟选项直接查表
+                    hit = _STATIC_SCHEDULE.get(choice)
+                    if hit is not None:
+                        delay, _, message = hit
+                        console.print(message)
+                        return delay
+                    
+                    # 依赖运行时状态的选项
+                    if choice == "5":
+                        delay = self._seconds_until_tomorrow(3)
+                        hours = delay // 3600
+                        minutes = (delay % 3600) // 60
+                        console.print(f"[green]✓ 将在次日凌晨 03:00 执行（{hours}小时{minutes}分钟后）[/green]")
+                        return delay
+                    elif choice == "6":
+                        delay = self._seconds_until_tomorrow(5)
+                        hours = delay // 3600
+                        minutes = (delay % 3600) // 60
+                        console.print(f"[green]✓ 将在次日凌晨 05:00 执行（{hours}小时{minutes}分钟后）[/green]")
+                        return delay
+                    elif choice == "7":
+                        return self._parse_custom_delay()
+                    elif choice == "8":
+                        return self._parse_target_datetime()
+                    else:
+                        console.print(f"[red]❌ 无效的选项: {choice}[/red]")
+                        continue
+                
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    console.print(f"[red]❌ 错误: {e}[/red]")
+                    continue
                 
         except KeyboardInterrupt:
             console.print("\n[yellow]⚠ 操作已取消[/yellow]")
             return None
-        except Exception as e:
-            console.print(f"[red]❌ 错误: {e}[/red]")
-            return self._select_schedule_time_interactive()
+    
+    @staticmethod
+    def _seconds_until_tomorrow(hour: int) -> int:
+        """
+        计算距离次日指定整点的秒数
+        
+        Args:
+            hour: 次日的小时（0-23）
+            
+        Returns:
+            int: 延迟秒数
+        """
+        now = datetime.now()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        return int((midnight + timedelta(hours=hour) - now).total_seconds())
     
     def _parse_custom_delay(self) -> Optional[int]:
         """
@@ -624,35 +826,37 @@ class RemoteDeployService:
         Returns:
             Optional[int]: 延迟秒数，None表示用户取消
         """
-        console.print()
         try:
-            minutes_str = Prompt.ask("[bold cyan]请输入延迟时间（分钟）[/bold cyan]")
-            minutes = int(minutes_str.strip())
-            
-            if minutes < 1:
-                console.print("[red]❌ 延迟时间必须大于等于 1 分钟[/red]")
-                return self._parse_custom_delay()
-            
-            if minutes > 10080:  # 7天
-                console.print("[red]❌ 延迟时间不能超过 7 天（10080 分钟）[/red]")
-                return self._parse_custom_delay()
-            
-            delay_seconds = minutes * 60
-            target_time = datetime.now() + timedelta(seconds=delay_seconds)
-            
-            hours = minutes // 60
-            mins = minutes % 60
-            if hours > 0:
-                time_str = f"{hours}小时{mins}分钟" if mins > 0 else f"{hours}小时"
-            else:
-                time_str = f"{mins}分钟"
-            
-            console.print(f"[green]✓ 将在 {time_str} 后执行（{target_time.strftime('%Y-%m-%d %H:%M:%S')}）[/green]")
-            return delay_seconds
+            while True:
+                console.print()
+                try:
+                    minutes_str = Prompt.ask("[bold cyan]请输入延迟时间（分钟）[/bold cyan]")
+                    minutes = int(minutes_str.strip())
+                except ValueError:
+                    console.print("[red]❌ 请输入有效的数字[/red]")
+                    continue
+                
+                if minutes < 1:
+                    console.print("[red]❌ 延迟时间必须大于等于 1 分钟[/red]")
+                    continue
+                
+                if minutes > 10080:  # 7天
+                    console.print("[red]❌ 延迟时间不能超过 7 天（10080 分钟）[/red]")
+                    continue
+                
+                delay_seconds = minutes * 60
+                target_time = datetime.now() + timedelta(seconds=delay_seconds)
+                
+                hours = minutes // 60
+                mins = minutes % 60
+                if hours > 0:
+                    time_str = f"{hours}小时{mins}分钟" if mins > 0 else f"{hours}小时"
+                else:
+                    time_str = f"{mins}分钟"
+                
+                console.print(f"[green]✓ 将在 {time_str} 后执行（{target_time.strftime('%Y-%m-%d %H:%M:%S')}）[/green]")
+                return delay_seconds
             
-        except ValueError:
-            console.print("[red]❌ 请输入有效的数字[/red]")
-            return self._parse_custom_delay()
         except KeyboardInterrupt:
             console.print("\n[yellow]⚠ 操作已取消[/yellow]")
             return None
@@ -673,96 +877,108 @@ class RemoteDeployService:
         console.print()
         
         try:
-            time_str = Prompt.ask("[bold cyan]请输入目标时间[/bold cyan]")
-            time_str = time_str.strip()
-            
-            now = datetime.now()
-            target_time = None
-            
-            # 尝试解析不同格式
-            formats = [
-                ("%H:%M", "今天"),
-                ("%H:%M:%S", "今天"),
-                ("%m-%d %H:%M", "今年"),
-                ("%Y-%m-%d %H:%M:%S", "完整"),
-                ("%Y-%m-%d %H:%M", "完整"),
-            ]
-            
-            for fmt, time_type in formats:
+            while True:
                 try:
-                    if time_type == "今天":
-                        parsed = datetime.strptime(time_str, fmt)
-                        target_time = now.replace(
-                            hour=parsed.hour,
-                            minute=parsed.minute,
-                            second=parsed.second if fmt == "%H:%M:%S" else 0,
-                            microsecond=0
-                        )
-                        # 如果时间已过，设置为明天
-                        if target_time <= now:
-                            target_time += timedelta(days=1)
-                    elif time_type == "今年":
-                        parsed = datetime.strptime(time_str, fmt)
-                        target_time = now.replace(
-                            month=parsed.month,
-                            day=parsed.day,
-                            hour=parsed.hour,
-                            minute=parsed.minute,
-                            second=0,
-                            microsecond=0
-                        )
-                        # 如果时间已过，设置为明年
-                        if target_time <= now:
-                            target_time = target_time.replace(year=target_time.year + 1)
-                    else:  # 完整
-                        target_time = datetime.strptime(time_str, fmt)
-                    
-                    break
-                except ValueError:
+                    delay_seconds = self._prompt_target_datetime()
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    console.print(f"[red]❌ 解析错误: {e}[/red]")
                     continue
-            
-            if target_time is None:
-                console.print("[red]❌ 时间格式错误，请使用支持的格式[/red]")
-                return self._parse_target_datetime()
-            
-            # 检查目标时间是否已过期
-            if target_time <= now:
-                console.print(f"[red]❌ 目标时间 {target_time.strftime('%Y-%m-%d %H:%M:%S')} 已过期[/red]")
-                console.print(f"[red]   当前时间: {now.strftime('%Y-%m-%d %H:%M:%S')}[/red]")
-                return self._parse_target_datetime()
-            
-            # 计算延迟秒数
-            delay_seconds = int((target_time - now).total_seconds())
-            
-            # 检查是否超过7天
-            if delay_seconds > 604800:
-                console.print("[red]❌ 目标时间不能超过 7 天后[/red]")
-                return self._parse_target_datetime()
-            
-            # 格式化显示时间差
-            hours = delay_seconds // 3600
-            minutes = (delay_seconds % 3600) // 60
-            seconds = delay_seconds % 60
-            
-            if hours > 0:
-                time_diff = f"{hours}小时{minutes}分钟"
-            elif minutes > 0:
-                time_diff = f"{minutes}分钟{seconds}秒"
-            else:
-                time_diff = f"{seconds}秒"
-            
-            console.print(f"[green]✓ 将在 {target_time.strftime('%Y-%m-%d %H:%M:%S')} 执行（{time_diff}后）[/green]")
-            return delay_seconds
-            
+                
+                if delay_seconds is not None:
+                    return delay_seconds
+                
         except KeyboardInterrupt:
             console.print("\n[yellow]⚠ 操作已取消[/yellow]")
             return None
-        except Exception as e:
-            console.print(f"[red]❌ 解析错误: {e}[/red]")
-            return self._parse_target_datetime()
+    
+    def _prompt_target_datetime(self) -> Optional[int]:
+        """
+        提示输入一次目标时间并计算延迟秒数
+        
+        Returns:
+            Optional[int]: 延迟秒数，输入无效时返回 None（调用方会重新提示）
+        """
+        time_str = Prompt.ask("[bold cyan]请输入目标时间[/bold cyan]")
+        time_str = time_str.strip()
+        
+        now = datetime.now()
+        target_time = None
+        
+        # 按输入形状预选格式解析
+        parsed_result = _strptime_target(time_str)
+        if parsed_result is not None:
+            parsed, fmt, time_type = parsed_result
+            if time_type == "今天":
+                target_time = now.replace(
+                    hour=parsed.hour,
+                    minute=parsed.minute,
+                    second=parsed.second if fmt == "%H:%M:%S" else 0,
+                    microsecond=0
+                )
+                # 如果时间已过，设置为明天
+                if target_time <= now:
+                    target_time += timedelta(days=1)
+            elif time_type == "今年":
+                try:
+                    target_time = now.replace(
+                        month=parsed.month,
+                        day=parsed.day,
+                        hour=parsed.hour,
+                        minute=parsed.minute,
+                        second=0,
+                        microsecond=0
+                    )
+                    # 如果时间已过，设置为明年
+                    if target_time <= now:
+                        target_time = target_time.replace(year=target_time.year + 1)
+                except ValueError:
+                    # 如 02-29 在非闰年无效
+                    target_time = None
+            else:  # 完整
+                target_time = parsed
+        
+        if target_time is None:
+            console.print("[red]❌ 时间格式错误，请使用支持的格式[/red]")
+            return None
+        
+        # 检查目标时间是否已过期
+        if target_time <= now:
+            console.print(f"[red]❌ 目标时间 {target_time.strftime('%Y-%m-%d %H:%M:%S')} 已过期[/red]")
+            console.print(f"[red]   当前时间: {now.strftime('%Y-%m-%d %H:%M:%S')}[/red]")
+            return None
+        
+        # 计算延迟秒数
+        delay_seconds = int((target_time - now).total_seconds())
+        
+        # 检查是否超过7天
+        if delay_seconds > 604800:
+            console.print("[red]❌ 目标时间不能超过 7 天后[/red]")
+            return None
+        
+        # 格式化显示时间差
+        hours = delay_seconds // 3600
+        minutes = (delay_seconds % 3600) // 60
+        seconds = delay_seconds % 60
+        
+        if hours > 0:
+            time_diff = f"{hours}小时{minutes}分钟"
+        elif minutes > 0:
+            time_diff = f"{minutes}分钟{seconds}秒"
+        else:
+            time_diff = f"{seconds}秒"
+        
+        console.print(f"[green]✓ 将在 {target_time.strftime('%Y-%m-%d %H:%M:%S')} 执行（{time_diff}后）[/green]")
+        return delay_seconds
+    
+    def _abort_countdown(self):
+        """中止正在进行的倒计时（不再执行部署）"""
+        self._abort.set()
+        self._cancel.set()
     
     def _countdown_wait(self, delay_seconds: int, server_config: Dict[str, Any],
-                       upload_types: Optional[List[str]], command_groups: Optional[List[str]]):
+                       upload_types: Optional[List[str]], command_groups: Optional[List[str]]) -> bool:
         """
         倒计时等待（支持 Ctrl+C 中断）
         
@@ -771,7 +987,15 @@ class RemoteDeployService:
             server_config: 服务器配置
             upload_types: 应用类型列表
             command_groups: 命令组列表
+            
+        Returns:
+            bool: 是否继续执行部署（倒计时结束、Ctrl+C 或按键时为 True，被中止时为 False）
         """
+        # 设置 DA_SONG_GE_NO_COUNTDOWN 时跳过等待（如 CI 中复用定时配置）
+        if os.getenv('DA_SONG_GE_NO_COUNTDOWN'):
+            console.print("[yellow]⚠ 已设置 DA_SONG_GE_NO_COUNTDOWN，跳过倒计时[/yellow]")
+            return not self._abort.is_set()
+        
         console.print()
         
         # 计算目标时间
@@ -792,7 +1016,8 @@ class RemoteDeployService:
             info_lines.append(f"  • [yellow]命令组:[/yellow] {', '.join(command_groups)}")
         
         info_lines.append("")
-        info_lines.append("[dim]💡 提示: 按 Ctrl+C 可取消等待并立即执行[/dim]")
+        skip_keys = "Ctrl+C 或任意键" if os.name == 'posix' and sys.stdin.isatty() else "Ctrl+C"
+        info_lines.append(f"[dim]💡 提示: 按 {skip_keys} 可取消等待并立即执行[/dim]")
         
         panel = Panel(
             "\n".join(info_lines),
@@ -804,16 +1029,28 @@ class RemoteDeployService:
         console.print(panel)
         console.print()
         
-        # 倒计时循环
+        # 仅定时部署时才需要 Live 显示，延迟导入
+        from rich.live import Live
+        
+        # 倒计时循环：Ctrl+C 置位取消事件，Event.wait 立即返回
+        # （不清除事件：后台任务可能在倒计时开始前就已请求中止）
+        # signal 只能在主线程注册
+        install_handler = threading.current_thread() is threading.main_thread()
+        if install_handler:
+            previous_handler = signal.signal(signal.SIGINT, lambda *_: self._cancel.set())
+        
+        # POSIX 终端下按任意键也可立即开始部署（cbreak 模式逐键读取）
+        key_fd, key_selector, saved_tty = self._open_key_listener()
+        
         try:
             total_seconds = max(1, int(delay_seconds))
-            start_time = time.monotonic()
+            # 单调时钟纳秒整数运算，不受系统时间调整影响
+            deadline_ns = time.monotonic_ns() + total_seconds * 1_000_000_000
 
             def _build_countdown_line(remaining: int) -> str:
                 # 计算时分秒
-                hours = remaining // 3600
-                minutes = (remaining % 3600) // 60
-                seconds = remaining % 60
+                hours, rest = divmod(remaining, 3600)
+                minutes, seconds = divmod(rest, 60)
 
                 # 格式化时间显示
                 if hours > 0:
@@ -824,52 +1061,103 @@ class RemoteDeployService:
                 # 计算进度百分比（基于 remaining，避免 elapsed 精度问题）
                 progress_percent = min(100, max(0, int(((total_seconds - remaining) / total_seconds) * 100)))
 
-                # 生成进度条（已完成部分用绿色，未完成部分用灰色）
-                bar_length = 50
-                filled_length = int(bar_length * progress_percent / 100)
-                filled_bar = f"[bold green]{'█' * filled_length}[/bold green]"
-                empty_bar = f"[grey62]{'░' * (bar_length - filled_length)}[/grey62]"
+                # 取预渲染的进度条（已完成部分用绿色，未完成部分用灰色）
+                bar = _COUNTDOWN_BARS[_COUNTDOWN_BAR_LENGTH * progress_percent // 100]
 
                 return (
                     f"⏰ 倒计时: [bold cyan]{time_str}[/bold cyan] "
-                    f"{filled_bar}{empty_bar} [bold yellow]{progress_percent}%[/bold yellow]"
+                    f"{bar} [bold yellow]{progress_percent}%[/bold yellow]"
                 )
 
             # 在倒计时行“下方”持续保留空白，避免贴终端底部
-            bottom_padding_lines = 10
+            bottom_padding = [""] * 10
 
-            with Live("", console=console, refresh_per_second=4, transient=True) as live:
+            # 关闭自动刷新，只在显示的秒数变化时重绘
+            with Live("", console=console, auto_refresh=False, transient=True) as live:
+                last_remaining = None
                 while True:
-                    elapsed_seconds = int(time.monotonic() - start_time)
-                    remaining = max(0, total_seconds - elapsed_seconds)
+                    remaining_ns = max(0, deadline_ns - time.monotonic_ns())
+                    # 向上取整，与“剩余整秒”的显示一致
+                    remaining = -(-remaining_ns // 1_000_000_000)
 
-                    countdown_renderable = Group(
-                        _build_countdown_line(remaining),
-                        *([""] * bottom_padding_lines)
-                    )
-                    live.update(countdown_renderable)
+                    if remaining != last_remaining:
+                        countdown_renderable = Group(
+                            _build_countdown_line(remaining),
+                            *bottom_padding
+                        )
+                        live.update(countdown_renderable, refresh=True)
+                        last_remaining = remaining
 
                     # 检查是否结束（在显示后检查，确保显示最后一秒）
                     if remaining <= 0:
                         break
 
-                    time.sleep(1)
+                    # 等到下一个整秒边界，期间可被 Ctrl+C 立即唤醒
+                    next_tick_ns = (remaining_ns - 1) % 1_000_000_000 + 1
+                    timeout = next_tick_ns / 1_000_000_000
+                    if key_selector is not None:
+                        # 同时等待按键：分段等待，兼顾取消事件
+                        if key_selector.select(timeout=min(timeout, 0.1)):
+                            os.read(key_fd, 1024)
+                            raise KeyboardInterrupt
+                        cancelled = self._cancel.is_set()
+                    else:
+                        cancelled = self._cancel.wait(timeout=timeout)
+                    if cancelled:
+                        if self._abort.is_set():
+                            break
+                        raise KeyboardInterrupt
+
+            if self._abort.is_set():
+                console.print("[red]❌ 倒计时已中止[/red]")
+                console.print()
+                return False
 
             # 显示最后的 100% 进度
-            bar_length = 50
-            filled_bar = f"[bold green]{'█' * bar_length}[/bold green]"
             console.print(
                 f"⏰ 倒计时: [bold cyan]00:00[/bold cyan] "
-                f"{filled_bar} [bold yellow]100%[/bold yellow]"
+                f"{_COUNTDOWN_BARS[-1]} [bold yellow]100%[/bold yellow]"
             )
             console.print()
             console.print("[green]✓ 倒计时结束，开始执行部署...[/green]")
             console.print()
+            return True
             
         except KeyboardInterrupt:
             console.print("\n")
             console.print("[yellow]⚠ 倒计时已取消，立即开始部署...[/yellow]")
             console.print()
+            return True
+        finally:
+            if install_handler:
+                signal.signal(signal.SIGINT, previous_handler)
+            if key_selector is not None:
+                key_selector.close()
+                import termios
+                termios.tcsetattr(key_fd, termios.TCSADRAIN, saved_tty)
+    
+    @staticmethod
+    def _open_key_listener() -> Tuple[Optional[int], Any, Any]:
+        """
+        准备在倒计时期间监听按键（仅 POSIX 终端）
+        
+        Returns:
+            Tuple: (标准输入 fd, selector, 原终端属性)，不支持时 selector 为 None
+        """
+        if os.name != 'posix' or not sys.stdin.isatty():
+            return None, None, None
+        try:
+            import termios
+            import tty
+            import selectors
+            fd = sys.stdin.fileno()
+            saved_tty = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+            key_selector = selectors.DefaultSelector()
+            key_selector.register(fd, selectors.EVENT_READ)
+            return fd, key_selector, saved_tty
+        except Exception:
+            return None, None, None
     
     def _execute_deployment(self, server_config: Dict[str, Any], 
                            upload_types: Optional[List[str]],
@@ -883,45 +1171,58 @@ class RemoteDeployService:
             'command_skipped': command_group is None or len(command_group) == 0
         }
         
+        local_tasks: Dict[str, Any] = {}
+        for upload_type in upload_types or []:
+            local_commands_config = server_config.get('local_commands', {}).get(upload_type)
+            if local_commands_config:
+                local_tasks[upload_type] = local_commands_config
+        
+        # 有本地命令且无需交互认证时，本地命令与上传按应用类型流水线执行（构建完成即上传）
+        pipelined = bool(local_tasks) and self._can_connect_unattended(server_config)
+        connect_future = None
+        
         # ========== 阶段 0: 执行本地命令（在连接服务器之前）==========
-        if upload_types:
-            console.print()
-            console.print(Panel.fit(
-                f"[bold yellow]阶段 0: 执行本地命令[/bold yellow]",
-                border_style="blue",
-                title="💻 本地命令"
-            ))
-            console.print()
+        if upload_types and not pipelined:
+            console.print(_stage_panel(f"[bold yellow]阶段 0: 执行本地命令[/bold yellow]", "💻 本地命令", "blue"))
             
-            for idx, upload_type in enumerate(upload_types, 1):
-                local_commands_config = server_config.get('local_commands', {}).get(upload_type)
-                
-                if local_commands_config:
-                    console.print(f"[bold cyan]▶ [{idx}/{len(upload_types)}] 本地命令: {upload_type}[/bold cyan]")
-                    console.print()
-                    
-                    success = self._execute_local_commands(
-                        local_commands_config, 
-                        upload_type
-                    )
-                    results['local_commands'][upload_type] = success
-                    
-                    if not success:
-                        console.print(Panel.fit(
-                            f"[bold red]❌ 本地命令执行失败 ({upload_type})，终止部署[/bold red]",
-                            border_style="red"
-                        ))
-                        return False
-                    
-                    console.print(f"[green]✓ 本地命令执行成功 ({upload_type})[/green]")
-                    console.print()
-                else:
+            for upload_type in upload_types:
+                if upload_type not in local_tasks:
                     console.print(f"[yellow]⚠ 跳过本地命令 ({upload_type})：未配置[/yellow]")
                     console.print()
+            
+            if local_tasks:
+                console.print(f"[bold cyan]▶ 本地命令: {', '.join(local_tasks)}[/bold cyan]")
+                console.print()
+                
+                # 多个应用类型并发执行时，各自的输出先写入缓冲区，完成后整体输出，避免交错
+                if len(local_tasks) > 1:
+                    def run_local(upload_type: str) -> bool:
+                        success, text = self._capture_local_commands(local_tasks[upload_type], upload_type)
+                        with self._console_lock:
+                            console.file.write(text)
+                            console.file.flush()
+                        return success
+                else:
+                    def run_local(upload_type: str) -> bool:
+                        return self._execute_local_commands(local_tasks[upload_type], upload_type)
+                
+                stage_results, failed_type = self._run_per_upload_type(list(local_tasks), run_local)
+                results['local_commands'].update(stage_results)
+                
+                if failed_type:
+                    console.print(_panel(
+                        f"[bold red]❌ 本地命令执行失败 ({failed_type})，终止部署[/bold red]",
+                        border_style="red"
+                    ))
+                    return False
+                
+                for upload_type in local_tasks:
+                    console.print(f"[green]✓ 本地命令执行成功 ({upload_type})[/green]")
+                console.print()
         
         # ========== 显示部署执行信息 ==========
         console.print()
-        console.print(Panel.fit(
+        console.print(_panel(
             f"[bold yellow]开始部署[/bold yellow]\n"
             f"[cyan]服务器:[/cyan] {server_config['name']}\n"
             f"[cyan]地址:[/cyan] {server_config['host']}:{server_config['port']}\n"
@@ -930,57 +1231,60 @@ class RemoteDeployService:
             title="🚀 部署执行"
         ))
         
-        # ========== 建立 SSH 连接（本地命令成功后才连接）==========
-        if not self._connect_to_server(server_config):
+        # ========== 建立 SSH 连接（流水线模式下在后台建立，与本地命令并行）==========
+        if pipelined:
+            connect_future = _EXECUTOR.submit(self._connect_to_server, server_config)
+        elif not self._connect_to_server(server_config):
             return False
         
         try:
+            # ========== 阶段 0/1: 本地命令与上传流水线 ==========
+            if pipelined:
+                if not self._run_build_upload_pipeline(server_config, upload_types, local_tasks,
+                                                       connect_future, results):
+                    return False
+            
             # ========== 阶段 1: 上传文件 ==========
-            if upload_types:
-                console.print()
-                console.print(Panel.fit(
-                    f"[bold yellow]阶段 1: 上传文件[/bold yellow]",
-                    border_style="blue",
-                    title="📤 文件上传"
-                ))
+            elif upload_types:
+                console.print(_stage_panel(f"[bold yellow]阶段 1: 上传文件[/bold yellow]", "📤 文件上传", "blue"))
+                
+                console.print(f"[bold cyan]▶ 上传文件: {', '.join(upload_types)}[/bold cyan]")
                 console.print()
                 
-                for idx, upload_type in enumerate(upload_types, 1):
-                    console.print(f"[bold cyan]▶ [{idx}/{len(upload_types)}] 上传文件: {upload_type}[/bold cyan]")
-                    console.print()
-                    
-                    success = self._upload_files(server_config, upload_type)
-                    results['uploads'][upload_type] = success
-                    
-                    if not success:
-                        console.print(Panel.fit(
-                            f"[bold red]❌ 文件上传失败 ({upload_type})，终止部署[/bold red]",
-                            border_style="red"
-                        ))
-                        return False
-                    
+                # 上传逐个执行：每次上传都有自己的实时进度条，同时只能显示一个
+                stage_results, failed_type = self._run_per_upload_type(
+                    upload_types,
+                    lambda upload_type: self._upload_files(server_config, upload_type),
+                    parallel=False
+                )
+                results['uploads'].update(stage_results)
+                
+                if failed_type:
+                    console.print(_panel(
+                        f"[bold red]❌ 文件上传失败 ({failed_type})，终止部署[/bold red]",
+                        border_style="red"
+                    ))
+                    return False
+                
+                for upload_type in upload_types:
                     console.print(f"[green]✓ 文件上传成功 ({upload_type})[/green]")
-                    console.print()
+                console.print()
             
             # ========== 阶段 2: 执行远程命令 ==========
             if command_group:
-                console.print()
-                console.print(Panel.fit(
-                    f"[bold yellow]阶段 2: 执行远程命令 ({', '.join(command_group)})[/bold yellow]",
-                    border_style="blue",
-                    title="⚙️  命令执行"
-                ))
-                console.print()
+                console.print(_stage_panel(f"[bold yellow]阶段 2: 执行远程命令 ({', '.join(command_group)})[/bold yellow]", "⚙️  命令执行", "blue"))
                 
+                # 只有一个命令组时不显示序号
+                total = len(command_group)
                 for idx, group in enumerate(command_group, 1):
-                    console.print(f"[bold cyan]▶ [{idx}/{len(command_group)}] 执行命令组: {group}[/bold cyan]")
-                    console.print()
+                    position = f"[{idx}/{total}] " if total > 1 else ""
+                    console.print(f"[bold cyan]▶ {position}执行命令组: {group}[/bold cyan]\n")
                     
                     success = self._execute_commands(server_config, group)
                     results['commands'][group] = success
                     
                     if not success:
-                        console.print(Panel.fit(
+                        console.print(_panel(
                             f"[bold red]❌ 命令执行失败 ({group})，终止部署[/bold red]",
                             border_style="red"
                         ))
@@ -995,9 +1299,163 @@ class RemoteDeployService:
             return True
             
         finally:
-            # 关闭连接
+            # 等待后台连接结束，再关闭连接（或保留到进程退出）
+            if connect_future is not None:
+                connect_future.result()
+            if self.file_uploader:
+                self.file_uploader.close()
             if self.ssh_client:
-                self.ssh_client.disconnect()
+                _release_ssh_client(self.ssh_client)
+    
+    def _run_build_upload_pipeline(self, server_config: Dict[str, Any], upload_types: List[str],
+                                   local_tasks: Dict[str, Any], connect_future: Any,
+                                   results: Dict[str, Any]) -> bool:
+        """
+        按应用类型流水线执行本地命令和文件上传
+        
+        每个应用类型在本地命令成功、且后台 SSH 连接建立后立即开始上传，
+        不必等待其他应用类型的本地命令全部完成。
+        
+        Args:
+            server_config: 服务器配置
+            upload_types: 应用类型列表
+            local_tasks: 需要执行本地命令的应用类型及其配置
+            connect_future: 后台建立 SSH 连接的 Future
+            results: 部署结果字典（写入 local_commands / uploads）
+            
+        Returns:
+            bool: 是否全部成功
+        """
+        console.print(_stage_panel(
+            "[bold yellow]阶段 0/1: 执行本地命令并上传文件（按应用类型流水线执行）[/bold yellow]",
+            "💻 本地命令 / 📤 文件上传", "blue"
+        ))
+        
+        for upload_type in upload_types:
+            if upload_type not in local_tasks:
+                console.print(f"[yellow]⚠ 跳过本地命令 ({upload_type})：未配置[/yellow]")
+        console.print(f"[bold cyan]▶ 本地命令: {', '.join(local_tasks)}；上传文件: {', '.join(upload_types)}[/bold cyan]")
+        console.print()
+        
+        # 本地命令按应用类型并发执行，上传只在当前线程按构建完成顺序逐个执行：
+        # 多个应用类型时构建输出先写入各自的缓冲区，轮到该应用类型时再输出，不会打断上传进度条
+        capture = len(upload_types) > 1
+        built: "queue.SimpleQueue[Tuple[str, bool, str]]" = queue.SimpleQueue()
+        
+        def build(upload_type: str):
+            success, text = True, ''
+            try:
+                if upload_type in local_tasks:
+                    if capture:
+                        success, text = self._capture_local_commands(local_tasks[upload_type], upload_type)
+                    else:
+                        success = self._execute_local_commands(local_tasks[upload_type], upload_type)
+            except Exception as e:
+                success, text = False, text + f"✗ {upload_type} 执行异常: {e}\n"
+            finally:
+                built.put((upload_type, success, text))
+        
+        def record_build(upload_type: str, success: bool, text: str):
+            if text:
+                console.file.write(text)
+                console.file.flush()
+            if upload_type in local_tasks:
+                results['local_commands'][upload_type] = success
+        
+        failed_type: Optional[str] = None
+        with ThreadPoolExecutor(max_workers=min(len(upload_types), 8)) as pool:
+            futures = [pool.submit(build, upload_type) for upload_type in upload_types]
+            for _ in upload_types:
+                upload_type, success, text = built.get()
+                record_build(upload_type, success, text)
+                if not success or not connect_future.result():
+                    failed_type = upload_type
+                    break
+                
+                success = self._upload_files(server_config, upload_type)
+                results['uploads'][upload_type] = success
+                if not success:
+                    failed_type = upload_type
+                    break
+            
+            if failed_type:
+                # 取消尚未开始的构建，已在运行的构建执行完毕
+                for future in futures:
+                    future.cancel()
+        
+        # 输出失败后才结束的构建
+        while True:
+            try:
+                record_build(*built.get_nowait())
+            except queue.Empty:
+                break
+        
+        # 按声明顺序整理结果（按完成顺序写入）
+        for key in ('local_commands', 'uploads'):
+            results[key] = {t: results[key][t] for t in upload_types if t in results[key]}
+        
+        if failed_type:
+            if results['local_commands'].get(failed_type) is False:
+                message = f"本地命令执行失败 ({failed_type})"
+            elif failed_type in results['uploads']:
+                message = f"文件上传失败 ({failed_type})"
+            else:
+                # 连接失败的原因已由 _connect_to_server 输出
+                message = "SSH 连接失败"
+            console.print(_panel(f"[bold red]❌ {message}，终止部署[/bold red]", border_style="red"))
+            return False
+        
+        for upload_type in upload_types:
+            if upload_type in local_tasks:
+                console.print(f"[green]✓ 本地命令执行成功 ({upload_type})[/green]")
+            console.print(f"[green]✓ 文件上传成功 ({upload_type})[/green]")
+        console.print()
+        return True
+    
+    def _run_per_upload_type(self, upload_types: List[str], task: Callable[[str], bool],
+                             parallel: bool = True) -> Tuple[Dict[str, bool], Optional[str]]:
+        """
+        按应用类型执行同一阶段的任务（本地命令 / 文件上传）
+        
+        并发执行时任一应用类型失败会取消尚未开始的任务，已在运行的任务会执行完毕。
+        只有一个应用类型或 parallel 为 False 时在当前线程依次执行，失败即停止。
+        
+        Args:
+            upload_types: 应用类型列表
+            task: 接收应用类型、返回是否成功的任务函数
+            parallel: 是否并发执行（任务会独占终端输出时设为 False）
+            
+        Returns:
+            Tuple[Dict[str, bool], Optional[str]]: (按应用类型顺序排列的结果, 第一个失败的应用类型)
+        """
+        if len(upload_types) == 1 or not parallel:
+            ordered: Dict[str, bool] = {}
+            for upload_type in upload_types:
+                ordered[upload_type] = success = task(upload_type)
+                if not success:
+                    return ordered, upload_type
+            return ordered, None
+        
+        done_results: Dict[str, bool] = {}
+        failed_type: Optional[str] = None
+        with ThreadPoolExecutor(max_workers=min(len(upload_types), 8)) as pool:
+            futures = {pool.submit(task, upload_type): upload_type for upload_type in upload_types}
+            for future in as_completed(futures):
+                upload_type = futures[future]
+                try:
+                    success = bool(future.result())
+                except Exception as e:
+                    with self._console_lock:
+                        console.print(f"[red]✗ {upload_type} 执行异常: {e}[/red]")
+                    success = False
+                done_results[upload_type] = success
+                if not success and failed_type is None:
+                    failed_type = upload_type
+                    for pending in futures:
+                        pending.cancel()
+        
+        ordered = {t: done_results[t] for t in upload_types if t in done_results}
+        return ordered, failed_type
     
     def _connect_to_server(self, server_config: Dict[str, Any]) -> bool:
         """连接到服务器"""
@@ -1005,10 +1463,8 @@ class RemoteDeployService:
         console.print("[bold green]🔌 正在建立 SSH 连接...[/bold green]")
         
         try:
-            # 从配置文件设置环境变量（SSHClient 会从环境变量读取）
-            os.environ['SERVER_IP'] = server_config['host']
-            os.environ['SERVER_PORT'] = str(server_config['port'])  # 新增：设置端口
-            os.environ['SERVER_USER'] = server_config['username']
+            # 认证信息直接传给 SSHClient，不写入环境变量（避免泄露给本地命令的子进程）
+            key_path: Optional[str] = None
             
             # 处理认证
             auth_config = server_config['auth']
@@ -1016,23 +1472,21 @@ class RemoteDeployService:
             if auth_config['type'] == 'ssh_key':
                 key_path = self.config_manager.expand_path(auth_config['key_path'])
                 
-                if not os.path.exists(key_path):
-                    console.print(Panel.fit(
+                # 一次 stat 同时完成存在性检查和权限检查
+                try:
+                    key_stat = os.stat(key_path)
+                except OSError:
+                    console.print(_panel(
                         f"[bold red]❌ SSH 密钥文件不存在: {key_path}[/bold red]",
                         border_style="red"
                     ))
                     return False
                 
                 # 检查密钥文件权限（可选）
-                self._check_key_permission(key_path)
-                
-                # 设置密钥路径到环境变量
-                os.environ['SSH_KEY_PATH'] = key_path
+                self._check_key_permission(key_path, key_stat)
                 
                 # 获取密码（可选，用作密钥的 passphrase）
                 password = self._get_password(auth_config, server_config['name'], is_passphrase=True)
-                if password:
-                    os.environ['SSH_PASSWORD'] = password
                 
                 console.print("[cyan]使用 SSH 密钥认证[/cyan]")
             
@@ -1042,44 +1496,70 @@ class RemoteDeployService:
                 if password is None:
                     return False
                 
-                os.environ['SSH_PASSWORD'] = password
-                # 清除密钥路径（如果有）
-                if 'SSH_KEY_PATH' in os.environ:
-                    del os.environ['SSH_KEY_PATH']
-                
                 console.print("[cyan]使用密码认证[/cyan]")
             
             else:
-                console.print(Panel.fit(
+                console.print(_panel(
                     f"[bold red]❌ 不支持的认证类型: {auth_config['type']}[/bold red]",
                     border_style="red"
                 ))
                 return False
             
+            from common.ssh_client import SSHClient
+            from remote_deploy.file_uploader import FileUploader
+            from remote_deploy.command_executor import CommandExecutor
+            
             # 创建 SSH 客户端
-            self.ssh_client = SSHClient()
+            self.ssh_client = SSHClient(
+                host=server_config['host'],
+                port=server_config['port'],
+                user=server_config['username'],
+                key_path=key_path,
+                password=password
+            )
             
-            # 显式建立连接（测试连接）
-            if not self.ssh_client.run("echo 'Connection test'", hide=True):
-                console.print(Panel.fit(
+            # 显式建立连接并检查 Transport 状态；只有拿到了 Transport 但其状态异常时才用远程命令再探测一次
+            # （无法连接时 get_transport 返回 None，不再重复连接）
+            transport = self.ssh_client.get_transport()
+            connected = transport is not None and transport.is_active()
+            if transport is not None and not connected:
+                connected = bool(self.ssh_client.run("echo 'Connection test'", hide=True))
+            if not connected:
+                console.print(_panel(
                     "[bold red]❌ SSH 连接测试失败[/bold red]",
                     border_style="red"
                 ))
                 return False
             
             self.file_uploader = FileUploader(self.ssh_client)
-            self.command_executor = CommandExecutor(self.ssh_client)
+            self.command_executor = CommandExecutor(self.ssh_client, server_config.get('command_timeout'))
             
             console.print("[green]✓ SSH 连接建立成功[/green]")
             return True
             
         except Exception as e:
-            console.print(Panel.fit(
+            console.print(_panel(
                 f"[bold red]❌ 连接服务器失败: {e}[/bold red]",
                 border_style="red"
             ))
             return False
     
+    @staticmethod
+    def _can_connect_unattended(server_config: Dict[str, Any]) -> bool:
+        """
+        判断建立连接时是否无需交互输入（可在后台线程中连接）
+        
+        Args:
+            server_config: 服务器配置
+            
+        Returns:
+            bool: 密钥认证或已配置密码时返回 True
+        """
+        auth_config = server_config.get('auth', {})
+        if auth_config.get('type') == 'ssh_key':
+            return True
+        return auth_config.get('type') == 'password' and bool(auth_config.get('password'))
+    
     def _get_password(self, auth_config: Dict[str, Any], server_name: str, is_passphrase: bool = False) -> Optional[str]:
         """
         获取密码
@@ -1108,7 +1588,7 @@ class RemoteDeployService:
             password = getpass.getpass("密码: ")
             
             if not password:
-                console.print(Panel.fit(
+                console.print(_panel(
                     "[bold red]❌ 密码不能为空[/bold red]",
                     border_style="red"
                 ))
@@ -1120,17 +1600,17 @@ class RemoteDeployService:
             console.print("\n[yellow]⚠ 操作已取消[/yellow]")
             return None
         except Exception as e:
-            console.print(Panel.fit(
+            console.print(_panel(
                 f"[bold red]❌ 获取密码失败: {e}[/bold red]",
                 border_style="red"
             ))
             return None
     
-    def _check_key_permission(self, key_path: str):
-        """检查密钥文件权限"""
+    def _check_key_permission(self, key_path: str, st: Optional[os.stat_result] = None):
+        """检查密钥文件权限（st 为已获取的文件状态，避免重复 stat）"""
         try:
-            import stat
-            st = os.stat(key_path)
+            if st is None:
+                st = os.stat(key_path)
             mode = st.st_mode & 0o777
             
             if mode != 0o600:
@@ -1139,23 +1619,45 @@ class RemoteDeployService:
         except Exception:
             pass
     
-    def _execute_local_commands(self, local_commands_config: Dict[str, Any], upload_type: str) -> bool:
+    def _capture_local_commands(self, local_commands_config: Dict[str, Any], upload_type: str) -> Tuple[bool, str]:
+        """
+        执行本地命令，输出（含命令本身的输出）写入缓冲区而不是终端
+        
+        Args:
+            local_commands_config: 本地命令配置
+            upload_type: 应用类型
+            
+        Returns:
+            Tuple[bool, str]: (执行是否成功, 缓冲的输出)
+        """
+        buffer = io.StringIO()
+        output = Console(file=buffer, force_terminal=console.is_terminal,
+                         color_system=console.color_system, width=console.width)
+        success = self._execute_local_commands(local_commands_config, upload_type, output)
+        return success, buffer.getvalue()
+    
+    def _execute_local_commands(self, local_commands_config: Dict[str, Any], upload_type: str,
+                                output: Optional[Console] = None) -> bool:
         """
         执行本地命令
         
         Args:
             local_commands_config: 本地命令配置
             upload_type: 应用类型
+            output: 输出控制台（可选，默认输出到终端）
             
         Returns:
             bool: 执行是否成功
         """
         commands = local_commands_config.get('commands', [])
+        parallel_groups = local_commands_config.get('parallel_groups')
         working_dir = local_commands_config.get('working_dir')
         stop_on_error = local_commands_config.get('stop_on_error', True)
+        parallel = local_commands_config.get('parallel', False)
+        max_concurrency = local_commands_config.get('max_concurrency')
         
-        if not commands:
-            console.print(Panel.fit(
+        if not commands and not parallel_groups:
+            (output or console).print(_panel(
                 f"[bold yellow]⚠ 本地命令配置为空: {upload_type}[/bold yellow]",
                 border_style="yellow"
             ))
@@ -1165,50 +1667,62 @@ class RemoteDeployService:
         if working_dir:
             working_dir = self.config_manager.expand_path(working_dir)
         
-        # 创建本地命令执行器
-        self.local_command_executor = LocalCommandExecutor(working_dir)
+        # 获取本地命令执行器（输出到终端时按工作目录复用；执行器只保存工作目录，可在线程间共享）
+        from remote_deploy.local_command_executor import LocalCommandExecutor
+        if output is not None:
+            executor = LocalCommandExecutor(working_dir, output)
+        else:
+            executor = self._local_executors.get(working_dir)
+            if executor is None:
+                executor = self._local_executors[working_dir] = LocalCommandExecutor(working_dir)
+        self.local_command_executor = executor
         
         # 执行命令组
-        return self.local_command_executor.execute_command_group(
+        return executor.execute_command_group(
             commands=commands,
             group_name=f"本地命令 ({upload_type})",
             working_dir=working_dir,
-            stop_on_error=stop_on_error
+            stop_on_error=stop_on_error,
+            parallel_groups=parallel_groups,
+            parallel=parallel,
+            max_concurrency=max_concurrency
         )
     
-    def _upload_files(self, server_config: Dict[str, Any], upload_type: str) -> bool:
-        """上传文件"""
+    def _upload_files(self, server_config: Dict[str, Any], upload_type: str,
+                      parallelism: int = 8) -> bool:
+        """上传文件（parallelism 为并发 SFTP 通道数，服务器配置 upload_parallelism 优先）"""
         upload_config = server_config.get('upload', {}).get(upload_type, [])
+        parallelism = server_config.get('upload_parallelism', parallelism)
         
         if not upload_config:
-            console.print(Panel.fit(
+            console.print(_panel(
                 f"[bold red]❌ 未找到上传配置: {upload_type}[/bold red]",
                 border_style="red"
             ))
             return False
         
         if not self.file_uploader:
-            console.print(Panel.fit(
+            console.print(_panel(
                 "[bold red]❌ 文件上传器未初始化[/bold red]",
                 border_style="red"
             ))
             return False
         
-        return self.file_uploader.upload_files(upload_config)
+        return self.file_uploader.upload_files(upload_config, parallelism=parallelism)
     
     def _execute_commands(self, server_config: Dict[str, Any], command_group: str) -> bool:
         """执行命令"""
         commands = server_config.get('commands', {}).get(command_group, [])
         
         if not commands:
-            console.print(Panel.fit(
+            console.print(_panel(
                 f"[bold red]❌ 未找到命令组: {command_group}[/bold red]",
                 border_style="red"
             ))
             return False
         
         if not self.command_executor:
-            console.print(Panel.fit(
+            console.print(_panel(
                 "[bold red]❌ 命令执行器未初始化[/bold red]",
                 border_style="red"
             ))
@@ -1218,75 +1732,66 @@ class RemoteDeployService:
     
     def _show_deployment_summary(self, server_config: Dict[str, Any], results: Dict[str, Any], upload_types: Optional[List[str]]):
         """显示部署摘要（支持多应用和多命令组）"""
-        console.print()
-        console.print(Panel.fit(
-            "[bold yellow]部署摘要[/bold yellow]",
-            border_style="magenta",
-            title="📊 摘要"
-        ))
-        console.print()
-        
-        # 创建摘要表格
-        table = Table(
-            box=box.ROUNDED,
-            border_style="bright_blue",
-            show_header=True,
-            header_style="bold cyan",
-            show_lines=True
-        )
-        
-        table.add_column("项目", style="bold yellow", width=25, vertical="middle")
-        table.add_column("状态", style="white", width=40, vertical="middle")
+        ok, failed, skipped = "[green]✓ 成功[/green]", "[red]✗ 失败[/red]", "[yellow]- 已跳过[/yellow]"
         
-        table.add_row("服务器", f"[cyan]{server_config['name']}[/cyan]")
-        table.add_row("地址", f"[cyan]{server_config['host']}:{server_config['port']}[/cyan]")
+        # 先收集全部行，再一次性生成表格
+        rows = [
+            ("服务器", f"[cyan]{server_config['name']}[/cyan]"),
+            ("地址", f"[cyan]{server_config['host']}:{server_config['port']}[/cyan]"),
+        ]
         
         # 本地命令执行结果（多应用）
-        if results['local_commands']:
-            for app_type, success in results['local_commands'].items():
-                status = "[green]✓ 成功[/green]" if success else "[red]✗ 失败[/red]"
-                table.add_row(f"本地命令 ({app_type})", status)
-        else:
-            table.add_row("本地命令", "[yellow]- 已跳过[/yellow]")
+        rows.extend(
+            [(f"本地命令 ({app_type})", ok if success else failed)
+             for app_type, success in results['local_commands'].items()]
+            or [("本地命令", skipped)]
+        )
         
         # 文件上传结果（多应用）
-        if results['uploads']:
-            for app_type, success in results['uploads'].items():
-                status = "[green]✓ 成功[/green]" if success else "[red]✗ 失败[/red]"
-                table.add_row(f"文件上传 ({app_type})", status)
-        else:
-            table.add_row("文件上传", "[yellow]- 已跳过[/yellow]")
+        rows.extend(
+            [(f"文件上传 ({app_type})", ok if success else failed)
+             for app_type, success in results['uploads'].items()]
+            or [("文件上传", skipped)]
+        )
         
         # 命令执行结果（多命令组）
         if not results['command_skipped']:
-            for group, success in results['commands'].items():
-                status = "[green]✓ 成功[/green]" if success else "[red]✗ 失败[/red]"
-                table.add_row(f"远程命令 ({group})", status)
+            rows.extend((f"远程命令 ({group})", ok if success else failed)
+                        for group, success in results['commands'].items())
         else:
-            table.add_row("远程命令", "[yellow]- 已跳过[/yellow]")
-        
-        console.print(table)
-        console.print()
-        
-        console.print(Panel.fit(
-            "[bold green]🎉 部署完成！[/bold green]",
-            border_style="green"
+            rows.append(("远程命令", skipped))
+        
+        if _IS_TTY:
+            table = Table(**_TABLE_KWARGS, show_lines=True)
+            table.add_column("项目", style="bold yellow", width=25, vertical="middle")
+            table.add_column("状态", style="white", width=40, vertical="middle")
+            for row in rows:
+                table.add_row(*row)
+        else:
+            # 非终端输出时每行一条纯文本，跳过表格布局
+            table = Group(*(Text(f"{name}: {Text.from_markup(status).plain}") for name, status in rows))
+        
+        # 标题、表格与完成提示合并为一次渲染
+        console.print(Group(
+            _stage_panel("[bold yellow]部署摘要[/bold yellow]", "📊 摘要", "magenta"),
+            table,
+            _BLANK,
+            _panel("[bold green]🎉 部署完成！[/bold green]", border_style="green"),
+            _BLANK,
         ))
-        console.print()
     
     def _show_dry_run_info(self, server_config: Dict[str, Any], 
                           upload_types: Optional[List[str]],
-                          command_group: Optional[List[str]]):
-        """显示模拟执行信息（支持多应用和多命令组）"""
+                          command_group: Optional[List[str]],
+                          output_format: str = 'rich',
+                          plan_stream: Optional[TextIO] = None):
+        """显示模拟执行信息（支持多应用和多命令组；JSON 格式写入 plan_stream，默认标准输出）"""
+        if output_format == 'json':
+            self._print_dry_run_json(server_config, upload_types, command_group, plan_stream)
+            return
+        
         # 创建基本信息表格
-        table = Table(
-            title="📋 服务器信息",
-            box=box.ROUNDED,
-            border_style="bright_blue",
-            show_header=True,
-            header_style="bold cyan",
-            show_lines=True
-        )
+        table = Table(title="📋 服务器信息", **_TABLE_KWARGS, show_lines=True)
         
         table.add_column("项目", style="bold yellow", width=15, vertical="middle")
         table.add_column("值", style="cyan", width=50, vertical="middle")
@@ -1304,7 +1809,7 @@ class RemoteDeployService:
                 local_commands_config = server_config.get('local_commands', {}).get(upload_type)
                 
                 if local_commands_config:
-                    console.print(Panel.fit(
+                    console.print(_panel(
                         f"[bold yellow]本地命令 [{idx}/{len(upload_types)}]: {upload_type}[/bold yellow]",
                         border_style="blue",
                         title="💻 本地命令"
@@ -1315,13 +1820,7 @@ class RemoteDeployService:
                     working_dir = local_commands_config.get('working_dir', '当前目录')
                     
                     # 创建本地命令表格
-                    local_cmd_table = Table(
-                        box=box.ROUNDED,
-                        border_style="bright_blue",
-                        show_header=True,
-                        header_style="bold cyan",
-                        show_lines=True
-                    )
+                    local_cmd_table = Table(**_TABLE_KWARGS, show_lines=True)
                     
                     local_cmd_table.add_column("序号", justify="center", style="bold yellow", width=6, vertical="middle")
                     local_cmd_table.add_column("命令", style="green", width=80, vertical="middle")
@@ -1335,7 +1834,7 @@ class RemoteDeployService:
                     console.print()
                 
                 # 显示上传任务
-                console.print(Panel.fit(
+                console.print(_panel(
                     f"[bold yellow]应用类型 [{idx}/{len(upload_types)}]: {upload_type}[/bold yellow]",
                     border_style="blue",
                     title="📤 上传任务"
@@ -1345,13 +1844,7 @@ class RemoteDeployService:
                 upload_config = server_config.get('upload', {}).get(upload_type, [])
                 
                 # 创建上传任务表格
-                upload_table = Table(
-                    box=box.ROUNDED,
-                    border_style="bright_blue",
-                    show_header=True,
-                    header_style="bold cyan",
-                    show_lines=True
-                )
+                upload_table = Table(**_TABLE_KWARGS, show_lines=True)
                 
                 upload_table.add_column("序号", justify="center", style="bold yellow", width=6, vertical="middle")
                 upload_table.add_column("本地路径", style="cyan", width=35, vertical="middle")
@@ -1364,6 +1857,10 @@ class RemoteDeployService:
                         options.append(f"模式: {item['mode']}")
                     if item.get('delete_extra'):
                         options.append("删除多余文件")
+                    if item.get('transfer') == 'tar':
+                        options.append("tar 流传输")
+                    if item.get('verify'):
+                        options.append("上传后校验")
                     
                     upload_table.add_row(
                         str(item_idx),
@@ -1377,7 +1874,7 @@ class RemoteDeployService:
         
         if command_group:
             for idx, group in enumerate(command_group, 1):
-                console.print(Panel.fit(
+                console.print(_panel(
                     f"[bold yellow]命令组 [{idx}/{len(command_group)}]: {group}[/bold yellow]",
                     border_style="blue",
                     title="⚙️  命令任务"
@@ -1387,28 +1884,59 @@ class RemoteDeployService:
                 commands = server_config.get('commands', {}).get(group, [])
                 
                 # 创建命令表格
-                cmd_table = Table(
-                    box=box.ROUNDED,
-                    border_style="bright_blue",
-                    show_header=True,
-                    header_style="bold cyan",
-                    show_lines=True
-                )
+                cmd_table = Table(**_TABLE_KWARGS, show_lines=True)
                 
                 cmd_table.add_column("序号", justify="center", style="bold yellow", width=6, vertical="middle")
                 cmd_table.add_column("命令", style="green", width=80, vertical="middle")
                 
                 for cmd_idx, cmd in enumerate(commands, 1):
-                    cmd_table.add_row(str(cmd_idx), cmd)
+                    cmd_table.add_row(str(cmd_idx), _format_command(cmd))
                 
                 console.print(cmd_table)
                 console.print()
         
-        console.print(Panel.fit(
+        console.print(_panel(
             "[bold green]✓ 模拟执行完成（未实际执行）[/bold green]",
             border_style="green"
         ))
         console.print()
+    
+    def _print_dry_run_json(self, server_config: Dict[str, Any],
+                            upload_types: Optional[List[str]],
+                            command_group: Optional[List[str]],
+                            stream: Optional[TextIO] = None):
+        """以 JSON 输出部署计划（跳过 Rich 渲染，便于 CI 比对；stream 默认为标准输出）"""
+        import json
+        
+        upload_types = upload_types or []
+        command_group = command_group or []
+        auth = server_config.get('auth', {})
+        
+        plan = {
+            'server': {
+                'name': server_config['name'],
+                'host': server_config['host'],
+                'port': server_config['port'],
+                'username': server_config['username'],
+                # 不输出密码等敏感信息
+                'auth': {k: v for k, v in auth.items() if k != 'password'},
+            },
+            'local_commands': {
+                upload_type: server_config.get('local_commands', {}).get(upload_type)
+                for upload_type in upload_types
+                if server_config.get('local_commands', {}).get(upload_type)
+            },
+            'upload': {
+                upload_type: server_config.get('upload', {}).get(upload_type, [])
+                for upload_type in upload_types
+            },
+            'commands': {
+                group: server_config.get('commands', {}).get(group, [])
+                for group in command_group
+            },
+        }
+        
+        print(json.dumps(plan, ensure_ascii=False, indent=2, default=str), file=stream or sys.stdout)
 
 
 if __name__ == '__main__':
@@ -1443,6 +1971,9 @@ if __name__ == '__main__':
   
   # 模拟执行（不实际上传和执行命令）
   python remote_deploy/deploy_service.py -s "领航不良资产" -u frontend_admin -d
+  
+  # 模拟执行并输出 JSON 格式的部署计划（适合 CI 比对）
+  python remote_deploy/deploy_service.py -s "领航不良资产" -u frontend_admin -d --dry-run-format json
         """
     )
     
@@ -1477,6 +2008,13 @@ if __name__ == '__main__':
         help='模拟执行（不实际上传和执行命令）'
     )
     
+    parser.add_argument(
+        '--dry-run-format',
+        choices=['rich', 'json'],
+        default='rich',
+        help='模拟执行输出格式（默认: rich，json 输出机器可读的部署计划）'
+    )
+    
     parser.add_argument(
         '-v', '--version',
         action='version',
@@ -1499,7 +2037,8 @@ if __name__ == '__main__':
             server_name=args.server,
             upload_types=upload_types,
             command_group=args.command_group,
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
+            dry_run_format=args.dry_run_format
         )
         
         sys.exit(0 if success else 1)
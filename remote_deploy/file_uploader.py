@@ -7,16 +7,31 @@
 """
 
 import os
+import queue
+import posixpath
+import hashlib
+import shlex
+import threading
 from pathlib import Path
-from typing import List, Dict, Set, Any
+from typing import List, Dict, Set, Any, Iterable, Iterator, Tuple, Optional
 from common.ssh_client import SSHClient
 from common.log_utils import log_info, log_warn, log_error
-from common.path_utils import expand_path, validate_path, get_relative_path, normalize_path
+from common.path_utils import expand_path, validate_path
 
 
 class FileUploader:
     """文件上传器类"""
     
+    # 默认并发 SFTP 通道数
+    DEFAULT_PARALLELISM = 8
+    # 本地文件读取 / 远程写入的块大小（1 MiB）
+    WRITE_BUFFER_SIZE = 1024 * 1024
+    
+    # 批量创建远程目录时每条命令携带的路径数（避免超出 ARG_MAX）
+    ARGS_BATCH_SIZE = 70
+    # 遍历与上传之间的队列长度（遍历最多领先上传这么多个文件，也是按大小排序的窗口）
+    UPLOAD_QUEUE_SIZE = 256
+    
     def __init__(self, ssh_client: SSHClient):
         """
         初始化文件上传器
@@ -25,13 +40,97 @@ class FileUploader:
             ssh_client: SSH 客户端实例
         """
         self.ssh_client = ssh_client
+        # 已确认存在的远程目录，避免重复检查
+        self._known_remote_dirs: Set[str] = set()
+        # 空闲 SFTP 通道池（同一 Transport 上打开，跨多次上传复用，由 close() 统一关闭）
+        self._sftp_pool: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._sftp_lock = threading.Lock()
+        # 已打开（含借出中）的 SFTP 通道数
+        self._sftp_open = 0
+        # 服务端拒绝打开更多通道时记录的上限（受 MaxSessions 限制），None 表示尚未触及
+        self._sftp_limit: Optional[int] = None
     
-    def upload_files(self, upload_configs: List[Dict[str, Any]]) -> bool:
+    def close(self) -> None:
+        """关闭通道池中的所有 SFTP 通道"""
+        while True:
+            try:
+                sftp = self._sftp_pool.get_nowait()
+            except queue.Empty:
+                break
+            self._discard_sftp(sftp)
+        with self._sftp_lock:
+            self._sftp_limit = None
+    
+    def _discard_sftp(self, sftp: Any) -> None:
+        """
+        关闭一个 SFTP 通道并从计数中移除
+        
+        Args:
+            sftp: 要关闭的 SFTP 通道
+        """
+        try:
+            sftp.close()
+        except Exception:
+            pass
+        with self._sftp_lock:
+            self._sftp_open -= 1
+    
+    def _acquire_sftp(self) -> Optional[Any]:
+        """
+        从通道池取出一个可用的 SFTP 通道
+        
+        池为空时新开一个；服务端拒绝打开（达到 MaxSessions）后记录上限，
+        之后等待其他线程归还通道。
+        
+        Returns:
+            paramiko SFTPClient 实例，一个通道都无法打开时返回 None
+        """
+        while True:
+            try:
+                sftp = self._sftp_pool.get_nowait()
+            except queue.Empty:
+                with self._sftp_lock:
+                    can_open = self._sftp_limit is None or self._sftp_open < self._sftp_limit
+                    if can_open:
+                        self._sftp_open += 1
+                if can_open:
+                    sftp = self.ssh_client.open_sftp()
+                    if sftp is not None:
+                        return sftp
+                    with self._sftp_lock:
+                        self._sftp_open -= 1
+                        if self._sftp_open == 0:
+                            return None
+                        self._sftp_limit = self._sftp_open
+                    log_warn(f"服务端拒绝打开更多 SFTP 通道，按 {self._sftp_limit} 个通道上传")
+                    continue
+                # 已达上限，等待其他线程归还通道
+                sftp = self._sftp_pool.get()
+            
+            channel = sftp.get_channel()
+            if channel is not None and not channel.closed and channel.get_transport().is_active():
+                return sftp
+            # 连接已重建，旧通道失效
+            self._discard_sftp(sftp)
+    
+    def _release_sftp(self, sftp: Optional[Any]) -> None:
+        """
+        将 SFTP 通道放回通道池
+        
+        Args:
+            sftp: 之前由 _acquire_sftp 取出的通道
+        """
+        if sftp is not None:
+            self._sftp_pool.put(sftp)
+    
+    def upload_files(self, upload_configs: List[Dict[str, Any]],
+                     parallelism: int = DEFAULT_PARALLELISM) -> bool:
         """
         上传文件（支持多个上传配置）
         
         Args:
             upload_configs: 上传配置列表
+            parallelism: 并发上传的 SFTP 通道数（超过服务端 MaxSessions 时按实际可打开的通道数上传）
             
         Returns:
             bool: 上传是否成功
@@ -40,9 +139,12 @@ class FileUploader:
             log_warn("没有需要上传的文件")
             return True
         
-        # 第一步：收集所有需要上传的文件
-        all_files_to_upload = []
+        # 第一步：检查上传任务，单个文件直接登记，目录在上传时边遍历边产出
+        single_files = []
+        directories = []  # (本地目录, 远程目录, 是否校验)
         directory_tasks = []  # 需要特殊处理的目录任务（sync 模式）
+        verify_paths: Set[str] = set()  # 上传后需要校验内容的远程文件（verify: true）
+        bulk_verify_dirs: List[Tuple[str, str]] = []  # 通过 rsync / tar 流整体上传、需要校验的目录
         
         for idx, config in enumerate(upload_configs, 1):
             log_info(f"[{idx}/{len(upload_configs)}] 分析上传任务...")
@@ -51,6 +153,7 @@ class FileUploader:
             remote_path = config['remote_path']
             mode = config.get('mode', 'copy')
             delete_extra = config.get('delete_extra', False)
+            verify = config.get('verify', False)
             
             # 检查本地路径是否存在
             if not os.path.exists(local_path):
@@ -63,7 +166,8 @@ class FileUploader:
                 if remote_path.endswith('/'):
                     remote_dir = remote_path.rstrip('/')
                 else:
-                    remote_dir = os.path.dirname(remote_path)
+                    # 远程路径始终按 POSIX 语义处理（Windows 客户端上 os.path 会把反斜杠也当作分隔符）
+                    remote_dir = posixpath.dirname(remote_path)
             else:
                 # 如果是目录，remote_path 本身就是目标目录
                 remote_dir = remote_path.rstrip('/')
@@ -78,9 +182,22 @@ class FileUploader:
                     remote_file = remote_path + os.path.basename(local_path)
                 else:
                     remote_file = remote_path
-                all_files_to_upload.append((local_path, remote_file))
+                single_files.append(
+                    (local_path, remote_file, os.path.basename(local_path), os.path.getsize(local_path))
+                )
+                if verify:
+                    verify_paths.add(remote_file)
                 
             else:
+                # sync + delete_extra 的目录优先交给 rsync，一次完成增量传输和多余文件删除
+                if mode == 'sync' and delete_extra and self._rsync_upload(local_path, remote_path):
+                    if verify:
+                        bulk_verify_dirs.append((local_path, remote_path))
+                    continue
+                
+                # transfer: tar 时整个目录通过一条 tar 流上传，失败时回退到 SFTP
+                streamed = config.get('transfer') == 'tar' and self._upload_tar_stream(local_path, remote_path)
+                
                 # 目录：收集目录中的所有文件
                 if mode == 'sync':
                     # sync 模式需要特殊处理（删除多余文件）
@@ -89,20 +206,42 @@ class FileUploader:
                         'remote_path': remote_path,
                         'delete_extra': delete_extra
                     })
+                if streamed:
+                    if verify:
+                        bulk_verify_dirs.append((local_path, remote_path))
+                    continue
                 
-                # 收集目录中的所有文件
-                files_in_dir = self._collect_directory_files(local_path, remote_path)
-                all_files_to_upload.extend(files_in_dir)
-        
-        # 第二步：批量上传所有文件（带进度条）
-        if all_files_to_upload:
-            log_info(f"共收集到 {len(all_files_to_upload)} 个文件")
-            if not self._upload_multiple_with_progress(all_files_to_upload):
+                # 目录中的文件在上传时遍历
+                directories.append((local_path, remote_path, verify))
+        
+        # 单个文件已全部已知，按大小降序排列
+        single_files.sort(key=lambda file_info: file_info[3], reverse=True)
+        
+        def iter_files() -> Iterator[tuple]:
+            yield from single_files
+            for local_dir, remote_dir, verify_dir in directories:
+                for file_info in self._collect_directory_files(local_dir, remote_dir):
+                    if verify_dir:
+                        verify_paths.add(file_info[1])
+                    yield file_info
+        
+        # 第二步：边遍历边上传所有文件（带进度条）
+        if single_files or directories:
+            if not self._upload_multiple_with_progress(iter_files(), parallelism, verify_paths):
                 log_error("批量上传文件失败")
                 return False
         else:
             log_warn("没有文件需要上传")
         
+        # rsync / tar 流上传的目录没有逐文件计算摘要，上传完成后读取本地文件计算并比对
+        if bulk_verify_dirs:
+            digests: Dict[str, str] = {}
+            for local_dir, remote_dir in bulk_verify_dirs:
+                digests.update(self._local_directory_digests(local_dir, remote_dir))
+            if digests and not self._verify_remote_digests(digests):
+                log_error("上传校验失败")
+                return False
+        
         # 第三步：处理 sync 模式的目录（删除多余文件）
         for task in directory_tasks:
             if task['delete_extra']:
@@ -113,41 +252,149 @@ class FileUploader:
         log_info("所有文件上传成功")
         return True
     
-    def _collect_directory_files(self, local_path: str, remote_path: str) -> List[tuple]:
+    def _collect_directory_files(self, local_path: str, remote_path: str) -> Iterator[tuple]:
         """
-        收集目录中的所有文件
+        遍历目录并逐批产出待上传文件（每遍历一批目录就批量创建所需的远程目录，再产出其中的文件）
         
         Args:
             local_path: 本地目录路径
             remote_path: 远程目录路径
             
-        Returns:
-            List[tuple]: 文件列表，每个元素是 (本地路径, 远程路径) 元组
+        Yields:
+            tuple: (本地路径, 远程路径, 文件名, 文件大小)，远程目录创建失败的文件会被跳过
+            
+        Raises:
+            OSError: 有文件无法读取时
         """
-        files_to_upload = []
+        # {远程目录: [(本地路径, 远程路径, 文件名, 文件大小), ...]}
+        files_by_dir: Dict[str, List[tuple]] = {}
+        remote_base = remote_path if remote_path.endswith('/') else remote_path + '/'
         
-        # 遍历本地目录
-        for root, dirs, files in os.walk(local_path):
-            # 计算相对路径
-            rel_path = os.path.relpath(root, local_path)
+        # 遍历本地目录（相对路径已统一为正斜杠）
+        for rel_dir, file_entries in self._walk(local_path):
+            remote_dir = remote_base + rel_dir if rel_dir else remote_path
+            remote_prefix = remote_dir if remote_dir.endswith('/') else remote_dir + '/'
             
-            # 构建远程目录路径
-            if rel_path == '.':
-                remote_dir = remote_path
-            else:
-                remote_dir = os.path.join(remote_path, rel_path).replace('\\', '/')
+            # 收集文件（文件大小取自目录项的 stat 缓存，上传前无需再次 stat）
+            files_by_dir[remote_dir] = [
+                (entry.path, remote_prefix + entry.name, entry.name, entry.stat().st_size)
+                for entry in file_entries
+            ]
             
-            # 确保远程目录存在
-            if not self._ensure_remote_directory(remote_dir):
+            if len(files_by_dir) >= self.ARGS_BATCH_SIZE:
+                yield from self._files_in_created_dirs(files_by_dir)
+                files_by_dir = {}
+        
+        yield from self._files_in_created_dirs(files_by_dir)
+    
+    def _files_in_created_dirs(self, files_by_dir: Dict[str, List[tuple]]) -> Iterator[tuple]:
+        """
+        一次性确保一批远程目录存在，产出其中可以上传的文件
+        
+        Args:
+            files_by_dir: {远程目录: 文件列表}
+            
+        Yields:
+            tuple: (本地路径, 远程路径, 文件名, 文件大小)，跳过创建失败目录中的文件
+        """
+        if not files_by_dir:
+            return
+        failed_dirs = self._ensure_remote_directories(list(files_by_dir))
+        for remote_dir, dir_files in files_by_dir.items():
+            if remote_dir not in failed_dirs:
+                yield from dir_files
+    
+    def _ensure_remote_directories(self, remote_dirs: List[str]) -> Set[str]:
+        """
+        批量确保远程目录存在（每批目录一次 SSH 调用：mkdir -p 后逐个验证）
+        
+        Args:
+            remote_dirs: 远程目录路径列表
+            
+        Returns:
+            Set[str]: 创建失败的目录
+        """
+        pending = [d for d in remote_dirs if d and d != '/' and d not in self._known_remote_dirs]
+        failed: Set[str] = set()
+        
+        for start in range(0, len(pending), self.ARGS_BATCH_SIZE):
+            batch = pending[start:start + self.ARGS_BATCH_SIZE]
+            quoted = " ".join(shlex.quote(d) for d in batch)
+            # 只输出创建后仍不是目录的路径
+            cmd = (
+                f"mkdir -p {quoted} 2>/dev/null; "
+                f"for d in {quoted}; do [ -d \"$d\" ] || printf '%s\\n' \"$d\"; done; true"
+            )
+            result = self.ssh_client.run(cmd, hide=True)
+            if result is None:
+                log_error("批量创建远程目录失败")
+                failed.update(batch)
                 continue
             
-            # 收集文件
-            for file in files:
-                local_file = os.path.join(root, file)
-                remote_file = os.path.join(remote_dir, file).replace('\\', '/')
-                files_to_upload.append((local_file, remote_file))
+            batch_failed = set(str(result).splitlines()) if isinstance(result, str) else set()
+            for remote_dir in batch:
+                if remote_dir in batch_failed:
+                    log_error(f"创建远程目录失败: {remote_dir}（路径可能已存在但不是目录）")
+                    failed.add(remote_dir)
+                else:
+                    self._known_remote_dirs.add(remote_dir)
+        
+        return failed
+    
+    def _rsync_upload(self, local_path: str, remote_path: str) -> bool:
+        """
+        使用 rsync over SSH 同步目录（增量传输并删除远程多余文件）
+        
+        仅在本地可用 rsync 且无需交互认证（BatchMode）时生效；本地缺少 rsync、
+        远程缺少 rsync 或认证失败时返回 False，由调用方回退到逐文件上传。
+        
+        Args:
+            local_path: 本地目录路径
+            remote_path: 远程目录路径
+            
+        Returns:
+            bool: 是否已通过 rsync 同步成功
+        """
+        import shutil
+        import subprocess
+        
+        rsync = shutil.which('rsync')
+        target = self.ssh_client.get_target()
+        host, user = target['host'], target['user']
+        if not rsync or not host or not user:
+            return False
         
-        return files_to_upload
+        ssh_command = [
+            'ssh', '-p', str(target['port']),
+            '-o', 'BatchMode=yes',
+            '-o', 'StrictHostKeyChecking=accept-new',
+        ]
+        key_path = target['key_path']
+        if key_path:
+            ssh_command += ['-i', key_path]
+        
+        command = [
+            rsync, '-az', '--delete',
+            '-e', shlex.join(ssh_command),
+            local_path.rstrip('/') + '/',
+            f"{user}@{host}:{remote_path.rstrip('/')}/",
+        ]
+        
+        log_info(f"使用 rsync 同步目录: {local_path} -> {remote_path}")
+        try:
+            result = subprocess.run(command, capture_output=True, text=True)
+        except OSError as e:
+            log_warn(f"rsync 启动失败，改为逐文件上传: {e}")
+            return False
+        
+        if result.returncode != 0:
+            log_warn(f"rsync 同步失败（退出码 {result.returncode}），改为逐文件上传")
+            if result.stderr.strip():
+                log_warn(result.stderr.strip())
+            return False
+        
+        log_info("rsync 同步完成")
+        return True
     
     def _handle_sync_delete(self, local_path: str, remote_path: str) -> bool:
         """
@@ -167,6 +414,11 @@ class FileUploader:
         local_files = self._get_local_files(local_path)
         log_info(f"本地文件数量: {len(local_files)}")
         
+        # 两端文件清单摘要一致时无需传输远程完整列表
+        if self._remote_manifest_hash(remote_path) == self._manifest_hash(local_files):
+            log_info("远程文件清单与本地一致，没有多余的远程文件需要删除")
+            return True
+        
         # 获取远程文件列表
         log_info("扫描远程文件...")
         remote_files = self._get_remote_files(remote_path)
@@ -183,6 +435,42 @@ class FileUploader:
         
         return True
     
+    @staticmethod
+    def _manifest_hash(files: Set[str]) -> str:
+        """
+        计算文件清单摘要（与 _remote_manifest_hash 的远程命令输出一致）
+        
+        Args:
+            files: 文件相对路径集合
+            
+        Returns:
+            str: 按字节序排序后的 "./相对路径\\0" 记录的 SHA-1
+        """
+        digest = hashlib.sha1()
+        for name in sorted(os.fsencode('./' + f) for f in files):
+            digest.update(name)
+            digest.update(b'\0')
+        return digest.hexdigest()
+    
+    def _remote_manifest_hash(self, remote_path: str) -> Optional[str]:
+        """
+        在远程计算文件清单摘要（只返回一行摘要，不传输文件列表）
+        
+        Args:
+            remote_path: 远程目录路径
+            
+        Returns:
+            Optional[str]: SHA-1 摘要，命令失败时返回 None
+        """
+        cmd = (
+            f"cd {shlex.quote(remote_path)} 2>/dev/null && "
+            f"find . -type f -print0 | LC_ALL=C sort -z | sha1sum"
+        )
+        result = self.ssh_client.run(cmd, hide=True)
+        if not isinstance(result, str) or not result:
+            return None
+        return result.split()[0]
+    
     def _upload_single_file(self, local_path: str, remote_path: str) -> bool:
         """
         上传单个文件
@@ -203,8 +491,15 @@ class FileUploader:
         else:
             remote_file = remote_path
         
-        # 使用 SSH 客户端上传文件（不带进度条）
-        result = self.ssh_client.put(local_path, remote_file)
+        # 使用通道池中的 SFTP 通道上传（不带进度条），打开失败时回退到 SSH 客户端
+        sftp = self._acquire_sftp()
+        try:
+            if sftp is not None:
+                result = self._sftp_put(sftp, local_path, remote_file, lambda sent: None)
+            else:
+                result = self.ssh_client.put(local_path, remote_file)
+        finally:
+            self._release_sftp(sftp)
         
         if not result:
             log_error(f"文件上传失败: {local_path}")
@@ -213,36 +508,36 @@ class FileUploader:
         log_info(f"文件上传成功: {os.path.basename(local_path)}")
         return True
     
-    def _upload_multiple_with_progress(self, file_list: List[tuple]) -> bool:
+    def _upload_multiple_with_progress(self, file_list: Iterable[tuple],
+                                       parallelism: int = DEFAULT_PARALLELISM,
+                                       verify_paths: Optional[Set[str]] = None) -> bool:
         """
-        批量上传文件并显示进度条（并行上传，所有进度条同时显示和更新）
+        批量上传文件并显示进度条（边遍历边上传）
+        
+        生产线程消费 file_list 并放入有界优先队列，工作线程从队列取文件上传，
+        遍历与上传相互重叠，内存占用与文件总数无关。
+        空闲的工作线程总是取队列中最大的文件（在线 LPT 调度），大文件尽早开始，
+        避免最后只剩一个大文件在传、其余通道空闲。
+        工作线程从通道池借用同一 SSH 连接上的 SFTP 通道，打开失败时回退到 SCP。
         
         Args:
-            file_list: 文件列表，每个元素是 (本地路径, 远程路径) 元组
+            file_list: 文件迭代器，每个元素是 (本地路径, 远程路径, 文件名, 文件大小) 元组；
+                遍历时抛出的 OSError 视为上传失败
+            parallelism: 最大并发通道数
+            verify_paths: 需要校验的远程文件路径（SFTP 上传时边读边计算 BLAKE2b，上传后批量比对远程 b2sum）；
+                可在遍历 file_list 的过程中补充
             
         Returns:
             bool: 上传是否成功
         """
-        import time
-        import threading
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from concurrent.futures import ThreadPoolExecutor
         from rich.progress import Progress, TextColumn, BarColumn, TaskProgressColumn, FileSizeColumn, TransferSpeedColumn, TimeRemainingColumn
         from rich.console import Console
         
         console = Console()
+        max_workers = max(1, parallelism)
         
-        # 检查所有文件是否存在并获取文件大小
-        files_info = []
-        for local_path, remote_path in file_list:
-            if not os.path.exists(local_path):
-                log_error(f"文件不存在: {local_path}")
-                return False
-            
-            file_size = os.path.getsize(local_path)
-            file_name = os.path.basename(local_path)
-            files_info.append((local_path, remote_path, file_name, file_size))
-        
-        log_info(f"准备并行上传 {len(files_info)} 个文件...")
+        log_info(f"开始并行上传（最多 {max_workers} 个通道）...")
         
         # 使用 Rich 进度条显示上传进度
         with Progress(
@@ -255,73 +550,329 @@ class FileUploader:
             console=console
         ) as progress:
             
-            # 第一步：先创建所有任务（所有进度条同时显示）
-            tasks = {}
-            for local_path, remote_path, file_name, file_size in files_info:
-                task_id = progress.add_task(f"上传 {file_name}...", total=file_size)
-                tasks[file_name] = task_id
+            # 总进度：总字节数随遍历进度增长
+            overall_task = progress.add_task("总进度", total=None)
+            # 元素为 (-文件大小, 序号, 文件信息)，序号保证同样大小时按入队顺序且不比较文件信息
+            file_queue: "queue.PriorityQueue[tuple]" = queue.PriorityQueue(maxsize=self.UPLOAD_QUEUE_SIZE)
             
             # 用于存储上传结果
-            upload_results = {}
+            failed_files: List[str] = []
             upload_lock = threading.Lock()
+            # 本地文件摘要 {远程路径: BLAKE2b-128 十六进制}
+            digests: Dict[str, str] = {}
+            # [已入队文件数, 已入队字节数, 已完成字节数]
+            stats = [0, 0, 0]
+            walk_failed = threading.Event()
+            
+            # 上传中文件的已发送字节数 {task_id: [sent]}：工作线程只写计数，
+            # 由刷新线程每 0.1 秒统一同步到进度条，避免每个数据块都竞争 Rich 的锁
+            active_counters: Dict[Any, List[int]] = {}
+            stop_refresh = threading.Event()
+            
+            def refresh_progress():
+                while not stop_refresh.wait(0.1):
+                    with upload_lock:
+                        snapshot = list(active_counters.items())
+                        queued_bytes, done_bytes = stats[1], stats[2]
+                    for task_id, counter in snapshot:
+                        progress.update(task_id, completed=counter[0])
+                    progress.update(overall_task, total=queued_bytes,
+                                    completed=done_bytes + sum(counter[0] for _, counter in snapshot))
+            
+            # 生产者：遍历文件放入有界队列，结束后为每个工作线程放入一个结束标记
+            def produce_files():
+                try:
+                    for seq, file_info in enumerate(file_list):
+                        with upload_lock:
+                            stats[0] += 1
+                            stats[1] += file_info[3]
+                        file_queue.put((-file_info[3], seq, file_info))
+                except OSError as e:
+                    log_error(f"文件不存在或无法读取: {e.filename}")
+                    walk_failed.set()
+                except Exception as e:
+                    log_error(f"遍历上传文件失败: {e}")
+                    walk_failed.set()
+                finally:
+                    # 结束标记排在所有文件之后
+                    for _ in range(max_workers):
+                        file_queue.put((float('inf'), 0, None))
             
             # 上传单个文件的函数
             def upload_file(local_path, remote_path, file_name, file_size):
-                task_id = tasks[file_name]
-                last_update_time = [time.time()]
+                task_id = progress.add_task(f"上传 {file_name}...", total=file_size)
+                counter = [0]
+                with upload_lock:
+                    active_counters[task_id] = counter
                 
-                # 进度回调函数
+                # 进度回调函数（SCP 回调签名为 (filename, size, sent)）
                 def progress_callback(filename, size, sent):
-                    current_time = time.time()
-                    elapsed = current_time - last_update_time[0]
-                    
-                    if elapsed > 0.1:  # 每0.1秒更新一次
-                        progress.update(task_id, completed=sent)
-                        last_update_time[0] = current_time
-                    else:
-                        progress.update(task_id, completed=sent)
+                    counter[0] = sent
                 
+                result = False
+                sftp = None
                 try:
-                    # 使用 SSH 客户端上传文件（带进度回调）
-                    result = self.ssh_client.put(local_path, remote_path, progress_callback)
-                    
-                    # 确保进度条完成
-                    progress.update(task_id, completed=file_size)
-                    
-                    with upload_lock:
-                        upload_results[file_name] = result
-                    
-                    return result
+                    sftp = self._acquire_sftp()
+                    if sftp is not None:
+                        # 使用通道池中的 SFTP 通道上传（带进度回调）
+                        hasher = hashlib.blake2b(digest_size=16) if verify_paths and remote_path in verify_paths else None
+                        result = self._sftp_put(sftp, local_path, remote_path,
+                                                lambda sent: progress_callback(file_name, file_size, sent), hasher)
+                        if result and hasher is not None:
+                            with upload_lock:
+                                digests[remote_path] = hasher.hexdigest()
+                    else:
+                        # 使用 SSH 客户端上传文件（SCP，带进度回调）
+                        result = self.ssh_client.put(local_path, remote_path, progress_callback)
                 except Exception as e:
                     log_error(f"文件上传异常: {file_name}, 错误: {e}")
-                    with upload_lock:
-                        upload_results[file_name] = False
-                    return False
-            
-            # 第二步：使用线程池并行上传所有文件
-            max_workers = min(len(files_info), 4)  # 最多4个并发上传
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # 提交所有上传任务
-                futures = []
-                for local_path, remote_path, file_name, file_size in files_info:
-                    future = executor.submit(upload_file, local_path, remote_path, file_name, file_size)
-                    futures.append(future)
+                    result = False
+                finally:
+                    self._release_sftp(sftp)
+                
+                with upload_lock:
+                    active_counters.pop(task_id, None)
+                    stats[2] += file_size
+                    if not result:
+                        failed_files.append(file_name)
                 
-                # 等待所有任务完成
-                for future in as_completed(futures):
+                # 确保进度条完成
+                progress.update(task_id, completed=file_size)
+                return result
+            
+            # 工作线程：从队列取文件上传，遇到结束标记退出
+            def upload_worker():
+                while True:
+                    _, _, file_info = file_queue.get()
+                    if file_info is None:
+                        return
+                    try:
+                        upload_file(*file_info)
+                    except Exception as e:
+                        # 保证工作线程持续消费队列，避免生产者阻塞
+                        log_error(f"文件上传异常: {file_info[2]}, 错误: {e}")
+                        with upload_lock:
+                            failed_files.append(file_info[2])
+            
+            # 使用线程池：一个生产者 + max_workers 个上传线程
+            refresher = threading.Thread(target=refresh_progress, daemon=True)
+            refresher.start()
+            with ThreadPoolExecutor(max_workers=max_workers + 1) as executor:
+                futures = [executor.submit(produce_files)]
+                futures += [executor.submit(upload_worker) for _ in range(max_workers)]
+                for future in futures:
                     try:
                         future.result()
                     except Exception as e:
                         log_error(f"上传任务异常: {e}")
             
-            # 检查所有文件是否上传成功
-            for file_name, result in upload_results.items():
-                if not result:
-                    log_error(f"文件上传失败: {file_name}")
-                    return False
+            stop_refresh.set()
+            refresher.join()
+            progress.update(overall_task, total=stats[1], completed=stats[2])
+        
+        if walk_failed.is_set():
+            return False
+        
+        # 检查所有文件是否上传成功
+        for file_name in failed_files:
+            log_error(f"文件上传失败: {file_name}")
+        if failed_files:
+            return False
+        
+        if stats[0] == 0:
+            log_warn("没有文件需要上传")
+        else:
+            log_info(f"共上传 {stats[0]} 个文件")
+        
+        # 校验已上传文件的内容（SCP 回退上传的文件没有本地摘要，不参与校验）
+        if digests and not self._verify_remote_digests(digests):
+            return False
         
         return True
     
+    def _local_directory_digests(self, local_path: str, remote_path: str) -> Dict[str, str]:
+        """
+        计算本地目录中所有文件的 BLAKE2b-128 摘要（用于整体上传的目录的上传后校验）
+        
+        Args:
+            local_path: 本地目录路径
+            remote_path: 远程目录路径
+            
+        Returns:
+            Dict[str, str]: {远程路径: 本地摘要}
+        """
+        digests: Dict[str, str] = {}
+        remote_base = remote_path if remote_path.endswith('/') else remote_path + '/'
+        for rel_dir, file_entries in self._walk(local_path):
+            remote_prefix = remote_base + rel_dir + '/' if rel_dir else remote_base
+            for entry in file_entries:
+                hasher = hashlib.blake2b(digest_size=16)
+                with open(entry.path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(self.WRITE_BUFFER_SIZE), b''):
+                        hasher.update(chunk)
+                digests[remote_prefix + entry.name] = hasher.hexdigest()
+        return digests
+    
+    def _verify_remote_digests(self, digests: Dict[str, str]) -> bool:
+        """
+        批量比对远程文件的 BLAKE2b-128 摘要（每批文件一次 SSH 调用）
+        
+        Args:
+            digests: {远程路径: 本地计算的摘要}
+            
+        Returns:
+            bool: 全部一致（或远程没有 b2sum 而跳过校验）时返回 True
+        """
+        log_info(f"校验 {len(digests)} 个已上传文件...")
+        paths = list(digests)
+        mismatched = []
+        
+        for start in range(0, len(paths), self.ARGS_BATCH_SIZE):
+            batch = paths[start:start + self.ARGS_BATCH_SIZE]
+            quoted = " ".join(shlex.quote(p) for p in batch)
+            cmd = f"command -v b2sum >/dev/null || {{ echo NO_B2SUM; exit 0; }}; b2sum -l 128 -- {quoted}"
+            result = self.ssh_client.run(cmd, hide=True)
+            if result == 'NO_B2SUM':
+                log_warn("远程服务器没有 b2sum，跳过上传校验")
+                return True
+            
+            lines = result.splitlines() if isinstance(result, str) else []
+            if len(lines) != len(batch):
+                log_error("获取远程文件摘要失败")
+                return False
+            
+            # b2sum 按参数顺序输出 "摘要  路径"，路径含特殊字符时行首带反斜杠
+            for remote_path, line in zip(batch, lines):
+                if line.lstrip('\\').split(' ', 1)[0] != digests[remote_path]:
+                    mismatched.append(remote_path)
+        
+        for remote_path in mismatched:
+            log_error(f"文件校验失败（远程内容与本地不一致）: {remote_path}")
+        if not mismatched:
+            log_info("所有文件校验通过")
+        return not mismatched
+    
+    def _upload_tar_stream(self, local_path: str, remote_path: str) -> bool:
+        """
+        通过单条 tar 流上传整个目录（远程执行 tar -xpf - 边收边解包，省去逐文件的 SFTP 往返）
+        
+        Args:
+            local_path: 本地目录路径
+            remote_path: 远程目录路径（需已存在）
+            
+        Returns:
+            bool: 上传是否成功（远程 tar 不可用或传输出错时返回 False，由调用方回退到 SFTP）
+        """
+        import tarfile
+        from rich.progress import Progress, TextColumn, BarColumn, TaskProgressColumn, FileSizeColumn, TransferSpeedColumn, TimeRemainingColumn
+        
+        # 遍历本地目录，记录 (本地路径, 归档内路径)，目录也写入归档以保留空目录
+        members: List[Tuple[str, str]] = []
+        total_size = 0
+        try:
+            for rel_dir, file_entries in self._walk(local_path):
+                if rel_dir:
+                    members.append((os.path.join(local_path, rel_dir), rel_dir))
+                prefix = rel_dir + '/' if rel_dir else ''
+                for entry in file_entries:
+                    members.append((entry.path, prefix + entry.name))
+                    total_size += entry.stat().st_size
+        except OSError as e:
+            log_error(f"文件不存在或无法读取: {e.filename}")
+            return False
+        
+        transport = self.ssh_client.get_transport()
+        if transport is None:
+            return False
+        
+        def reset_owner(tarinfo):
+            # 不携带本地用户信息，解包后的属主与 SFTP 上传一致（即远程登录用户）
+            tarinfo.uid = tarinfo.gid = 0
+            tarinfo.uname = tarinfo.gname = ''
+            return tarinfo
+        
+        log_info(f"使用 tar 流上传目录: {local_path} ({len(members)} 项)")
+        channel = None
+        try:
+            channel = transport.open_session()
+            channel.exec_command(f"tar -xpf - -C {shlex.quote(remote_path)}")
+            
+            with Progress(
+                TextColumn("[bold blue]{task.description:<30}"),
+                BarColumn(complete_style="green"),
+                FileSizeColumn(),
+                TransferSpeedColumn(),
+                TaskProgressColumn(),
+                TimeRemainingColumn(),
+            ) as progress:
+                task_id = progress.add_task(os.path.basename(local_path.rstrip('/')) or local_path, total=total_size)
+                
+                class _ChannelWriter:
+                    """将 tarfile 的写入转发到 SSH 通道并更新进度"""
+                    def write(self, data):
+                        channel.sendall(data)
+                        progress.update(task_id, advance=len(data))
+                
+                with tarfile.open(mode='w|', fileobj=_ChannelWriter(), bufsize=self.WRITE_BUFFER_SIZE) as tar:
+                    for member_path, arcname in members:
+                        tar.add(member_path, arcname=arcname, recursive=False, filter=reset_owner)
+                
+                progress.update(task_id, completed=total_size)
+            
+            channel.shutdown_write()
+            exit_code = channel.recv_exit_status()
+            if exit_code != 0:
+                error = channel.makefile_stderr('rb').read().decode('utf-8', 'replace').strip()
+                log_warn(f"tar 流上传失败（退出码 {exit_code}），回退到 SFTP: {error}")
+                return False
+            
+            log_info(f"tar 流上传完成: {local_path}")
+            return True
+        except Exception as e:
+            log_warn(f"tar 流上传失败，回退到 SFTP: {e}")
+            return False
+        finally:
+            if channel is not None:
+                channel.close()
+    
+    def _sftp_put(self, sftp: Any, local_path: str, remote_path: str, callback,
+                  hasher: Optional[Any] = None) -> bool:
+        """
+        通过 SFTP 通道上传单个文件（按 1 MiB 块读取，流水线写入）
+        
+        1 MiB 左右的发送缓冲即可让 SFTP 吞吐接近饱和，再大收益有限；
+        通道窗口大小见 SSHClient.open_sftp。
+        
+        Args:
+            sftp: paramiko SFTPClient 实例
+            local_path: 本地文件路径
+            remote_path: 远程文件路径
+            callback: 进度回调函数 (sent)
+            hasher: hashlib 摘要对象（可选），传入时用同一次读取的数据更新，无需再次读取文件
+            
+        Returns:
+            bool: 上传是否成功
+        """
+        try:
+            sent = 0
+            with open(local_path, 'rb') as local_file, \
+                    sftp.open(remote_path, 'wb', bufsize=self.WRITE_BUFFER_SIZE) as remote_file:
+                # 不等待每个写请求的确认，关闭文件时统一检查
+                remote_file.set_pipelined(True)
+                while True:
+                    chunk = local_file.read(self.WRITE_BUFFER_SIZE)
+                    if not chunk:
+                        break
+                    remote_file.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    sent += len(chunk)
+                    callback(sent)
+            return True
+        except Exception as e:
+            log_error(f"SFTP 上传失败: {local_path}, 错误: {e}")
+            return False
+    
     def _get_local_files(self, local_path: str) -> Set[str]:
         """
         获取本地文件列表（相对路径）
@@ -333,14 +884,45 @@ class FileUploader:
             Set[str]: 文件相对路径集合
         """
         files = set()
-        for root, dirs, filenames in os.walk(local_path):
-            for filename in filenames:
-                full_path = os.path.join(root, filename)
-                rel_path = os.path.relpath(full_path, local_path)
-                # 统一使用正斜杠
-                files.add(rel_path.replace('\\', '/'))
+        for rel_dir, file_entries in self._walk(local_path):
+            prefix = rel_dir + '/' if rel_dir else ''
+            files.update(prefix + entry.name for entry in file_entries)
         return files
     
+    @staticmethod
+    def _walk(root: str) -> Iterator[Tuple[str, List[os.DirEntry]]]:
+        """
+        遍历本地目录（基于 os.scandir，直接使用目录项缓存的类型信息）
+        
+        与 os.walk 一致：不进入指向目录的符号链接，也不把它们当作文件。
+        
+        Args:
+            root: 本地目录路径
+            
+        Yields:
+            Tuple[str, List[os.DirEntry]]: (以正斜杠分隔的相对目录，根目录为 '', 该目录下的文件项)
+        """
+        stack = [(root, '')]
+        while stack:
+            dir_path, rel_dir = stack.pop()
+            file_entries = []
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if is_dir:
+                            if not entry.is_symlink():
+                                stack.append((entry.path, rel_dir + '/' + entry.name if rel_dir else entry.name))
+                        else:
+                            file_entries.append(entry)
+            except OSError:
+                # 与 os.walk 一致，忽略无法读取的目录
+                continue
+            yield rel_dir, file_entries
+    
     def _get_remote_files(self, remote_path: str) -> Set[str]:
         """
         获取远程文件列表（相对路径）
@@ -353,25 +935,38 @@ class FileUploader:
         """
         files = set()
         
-        # 使用 find 命令获取远程文件列表
-        # 添加 2>/dev/null 忽略错误，|| true 确保命令总是成功
-        cmd = f"find {remote_path} -type f 2>/dev/null || true"
-        result = self.ssh_client.run(cmd, hide=True)
+        transport = self.ssh_client.get_transport()
+        if transport is None:
+            return files
         
-        if result:
-            for line in result.split('\n'):
-                line = line.strip()
-                if line and line.startswith(remote_path):
-                    # 计算相对路径
-                    rel_path = line[len(remote_path):].lstrip('/')
-                    if rel_path:
-                        files.add(rel_path)
+        # 以 NUL 分隔输出相对路径（-print0 在 GNU / BusyBox find 中均可用，文件名含换行也不会错位）
+        # 目录不存在时 cd 失败，输出为空
+        cmd = f"cd {shlex.quote(remote_path)} 2>/dev/null && find . -type f -print0 2>/dev/null"
+        channel = None
+        try:
+            channel = transport.open_session()
+            channel.exec_command(cmd)
+            # 边接收边按 NUL 切分，不在内存中保留完整输出
+            pending = b''
+            while True:
+                chunk = channel.recv(self.WRITE_BUFFER_SIZE)
+                if not chunk:
+                    break
+                *names, pending = (pending + chunk).split(b'\0')
+                for name in names:
+                    # 去掉 find 输出的 "./" 前缀
+                    files.add(name[2:].decode('utf-8', 'surrogateescape'))
+        except Exception as e:
+            log_error(f"获取远程文件列表失败: {e}")
+        finally:
+            if channel is not None:
+                channel.close()
         
         return files
     
     def _delete_remote_files(self, remote_path: str, files: Set[str]) -> bool:
         """
-        删除远程文件
+        删除远程文件（文件列表以 NUL 分隔经标准输入传给 xargs -0 rm，一次 SSH 调用完成）
         
         Args:
             remote_path: 远程目录路径
@@ -382,19 +977,33 @@ class FileUploader:
         """
         log_info(f"删除 {len(files)} 个多余的远程文件...")
         
-        success = True
-        for file in files:
-            remote_file = os.path.join(remote_path, file).replace('\\', '/')
-            cmd = f"rm -f '{remote_file}'"
-            
-            if not self.ssh_client.run(cmd, hide=True):
-                log_warn(f"删除远程文件失败: {remote_file}")
-                success = False
+        transport = self.ssh_client.get_transport()
+        if transport is None:
+            log_error("删除远程文件失败: 无法获取 SSH 连接")
+            return False
+        
+        # 远程目录只转义一次，文件路径经标准输入传递，无需逐个转义，也不受 ARG_MAX 限制
+        cmd = f"cd {shlex.quote(remote_path)} && xargs -0 rm -f --"
+        channel = None
+        try:
+            channel = transport.open_session()
+            channel.exec_command(cmd)
+            channel.sendall(b'\0'.join(os.fsencode(file) for file in sorted(files)))
+            channel.shutdown_write()
+            exit_code = channel.recv_exit_status()
+        except Exception as e:
+            log_error(f"删除远程文件失败: {e}")
+            return False
+        finally:
+            if channel is not None:
+                channel.close()
         
-        if success:
-            log_info("所有多余文件删除成功")
+        if exit_code != 0:
+            log_warn(f"部分远程文件删除失败（退出码 {exit_code}）")
+            return False
         
-        return success
+        log_info("所有多余文件删除成功")
+        return True
     
     def _ensure_remote_directory(self, remote_path: str) -> bool:
         """
@@ -406,50 +1015,37 @@ class FileUploader:
         Returns:
             bool: 操作是否成功
         """
-        if not remote_path or remote_path == '/':
+        if not remote_path or remote_path == '/' or remote_path in self._known_remote_dirs:
             return True
         
-        # 先检查路径是否已存在且是目录
-        is_dir_cmd = f"[ -d '{remote_path}' ] && echo 'is_dir' || echo 'not_dir'"
-        is_dir_result = self.ssh_client.run(is_dir_cmd, hide=True)
-        
-        # 确保返回值是字符串
-        is_dir_str = str(is_dir_result) if is_dir_result else ''
+        # 一次 SSH 调用完成检查与创建: D=已是目录, F=存在但不是目录, C=已创建, E=创建失败
+        q = shlex.quote(remote_path)
+        cmd = (
+            f"if [ -d {q} ]; then echo D; elif [ -e {q} ]; then echo F; "
+            f"else mkdir -p {q} && [ -d {q} ] && echo C || echo E; fi"
+        )
+        result = self.ssh_client.run(cmd, hide=True)
+        status = next((line.strip() for line in str(result).splitlines() if line.strip()), '') \
+            if isinstance(result, str) else ''
         
-        if 'is_dir' in is_dir_str:
-            # 已经是目录，直接返回成功
+        if status == 'D':
+            self._known_remote_dirs.add(remote_path)
             return True
         
-        # 检查路径是否存在但不是目录（可能是文件）
-        exists_cmd = f"[ -e '{remote_path}' ] && echo 'exists' || echo 'not_exists'"
-        exists_result = self.ssh_client.run(exists_cmd, hide=True)
-        
-        # 确保返回值是字符串
-        exists_str = str(exists_result) if exists_result else ''
+        if status == 'C':
+            log_info(f"创建远程目录: {remote_path}")
+            self._known_remote_dirs.add(remote_path)
+            return True
         
-        if 'exists' in exists_str and 'not_exists' not in exists_str:
+        if status == 'F':
             # 存在但不是目录，获取详细信息
-            ls_cmd = f"ls -la '{remote_path}' 2>&1"
-            ls_result = self.ssh_client.run(ls_cmd, hide=False)
+            self.ssh_client.run(f"ls -la {q} 2>&1", hide=False)
             
             log_error(f"路径 '{remote_path}' 已存在但不是目录，无法创建")
-            log_error(f"请在服务器上删除该文件: rm -f '{remote_path}'")
+            log_error(f"请在服务器上删除该文件: rm -f {q}")
             log_error(f"或者修改配置文件中的 remote_path")
             return False
         
-        # 路径不存在，创建目录（包括父目录）
-        log_info(f"创建远程目录: {remote_path}")
-        cmd = f"mkdir -p '{remote_path}'"
-        result = self.ssh_client.run(cmd, hide=True)
-        
-        # 验证目录是否创建成功
-        verify_cmd = f"[ -d '{remote_path}' ] && echo 'created' || echo 'failed'"
-        verify_result = self.ssh_client.run(verify_cmd, hide=True)
-        verify_str = str(verify_result) if verify_result else ''
-        
-        if 'created' in verify_str:
-            return True
-        else:
-            log_error(f"创建远程目录失败: {remote_path}")
-            return False
+        log_error(f"创建远程目录失败: {remote_path}")
+        return False
 
@@ -12,7 +12,7 @@ import time
 import requests
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -20,6 +20,18 @@ from rich import box
 
 console = Console()
 
+# 缓存文件序列化：优先使用 orjson（已安装时），否则回退到标准库 json，两者读写同一紧凑格式
+try:
+    import orjson
+    
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    _json_loads = json.loads
+
 
 class LicenseValidator:
     """授权验证器类"""
@@ -37,6 +49,9 @@ class LicenseValidator:
     # 请求超时时间（秒）
     REQUEST_TIMEOUT = 10
     
+    # 进程内共享的 HTTP 会话（保持连接，重复验证时复用 TCP/TLS 连接）
+    _session: Optional[requests.Session] = None
+    
     def __init__(self, license_key: str):
         """
         初始化授权验证器
@@ -45,8 +60,35 @@ class LicenseValidator:
             license_key: 授权密钥
         """
         self.license_key = license_key
+        # 已解析的缓存文件: 文件标识 (mtime_ns, size)、授权数据、过期时间戳
+        self._cache_stamp: Optional[Tuple[int, int]] = None
+        self._cache_data: Optional[Dict[str, Any]] = None
+        self._cache_expires_at = 0.0
         self._ensure_cache_dir()
     
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        """
+        获取共享的 HTTP 会话（首次使用时创建，连接失败时自动重试）
+        
+        Returns:
+            requests.Session: HTTP 会话
+        """
+        if cls._session is None:
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=2,
+                max_retries=Retry(total=2, backoff_factor=0.3),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            cls._session = session
+        return cls._session
+    
     def _ensure_cache_dir(self):
         """确保缓存目录存在"""
         if not self.CACHE_DIR.exists():
@@ -74,7 +116,7 @@ class LicenseValidator:
         console.print("[cyan]⏳ 正在验证授权密钥...[/cyan]")
         
         try:
-            response = requests.get(
+            response = self._get_session().get(
                 self.VERIFY_URL,
                 params={"license_code": self.license_key},
                 timeout=self.REQUEST_TIMEOUT
@@ -141,34 +183,48 @@ class LicenseValidator:
             Optional[Dict]: 授权数据，如果缓存无效则返回 None
         """
         try:
-            if not self.CACHE_FILE.exists():
-                return None
-            
-            with open(self.CACHE_FILE, 'r', encoding='utf-8') as f:
-                cache = json.load(f)
+            st = os.stat(self.CACHE_FILE)
+        except OSError:
+            return None
+        
+        # 缓存文件未变化时直接复用上次解析结果
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp != self._cache_stamp:
+            self._cache_data, self._cache_expires_at = self._parse_cache()
+            self._cache_stamp = stamp
+        
+        # 检查缓存是否过期
+        if self._cache_data is None or time.time() > self._cache_expires_at:
+            return None
+        
+        # 返回授权数据
+        return self._cache_data
+    
+    def _parse_cache(self) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        读取并解析缓存文件
+        
+        Returns:
+            Tuple[Optional[Dict], float]: (授权数据, 过期时间戳)，缓存无效时授权数据为 None
+        """
+        try:
+            cache = _json_loads(self.CACHE_FILE.read_bytes())
             
             # 检查缓存的授权密钥是否匹配
             if cache.get("license_code") != self.license_key:
-                return None
+                return None, 0.0
             
             # 检查缓存时间
             cached_time_str = cache.get("cached_time")
             if not cached_time_str:
-                return None
+                return None, 0.0
             
-            cached_time = datetime.fromisoformat(cached_time_str)
-            now = datetime.now()
-            
-            # 检查缓存是否过期
-            if now - cached_time > timedelta(hours=self.CACHE_VALIDITY_HOURS):
-                return None
-            
-            # 返回授权数据
-            return cache.get("data")
+            cached_ts = datetime.fromisoformat(cached_time_str).timestamp()
+            return cache.get("data"), cached_ts + self.CACHE_VALIDITY_HOURS * 3600
             
         except Exception:
             # 缓存加载失败，忽略错误
-            return None
+            return None, 0.0
     
     def _save_cache(self, data: Dict[str, Any]):
         """
@@ -184,8 +240,8 @@ class LicenseValidator:
                 "data": data
             }
             
-            with open(self.CACHE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(cache, f, ensure_ascii=False, indent=2)
+            # 缓存文件不需要手工编辑，写入紧凑格式
+            self.CACHE_FILE.write_bytes(_json_dumps(cache))
                 
         except Exception:
             # 缓存保存失败，忽略错误（不影响主流程）
@@ -7,44 +7,146 @@
 """
 
 import os
+import re
+import sys
+import asyncio
+import queue
+import shlex
+import shutil
+import signal
+import codecs
+import threading
 import subprocess
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional, Union
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 console = Console()
 
+# 伪终端相关模块只在类 Unix 系统上可用（Windows 下回退为管道读取输出）
+try:
+    import pty
+    import fcntl
+    import select
+    import struct
+    import termios
+    _HAS_PTY = True
+except ImportError:
+    _HAS_PTY = False
+
+# 命令输出前后的分隔线
+_RULE = "[dim]" + "─" * 60 + "[/dim]"
+
+# 需要交给 shell 解释的字符（管道、重定向、变量、通配符、引号、转义、注释、环境变量赋值等）
+_NEEDS_SHELL = re.compile(r'[|&;<>()$`\\"\'*?\[\]{}#~=%!\n]')
+
+# ANSI 控制序列（颜色、光标移动等），失败输出中去除后原样写出
+_ANSI_RE = re.compile(rb'\x1b\[[0-9;?]*[ -/]*[@-~]')
+
+# 只能由 shell 执行的内置命令（或与同名外部程序行为不同的命令）
+_SHELL_BUILTINS = frozenset({
+    '.', ':', 'alias', 'cd', 'command', 'echo', 'eval', 'exec', 'exit', 'export',
+    'printf', 'read', 'set', 'shift', 'source', 'test', 'trap', 'type', 'ulimit',
+    'umask', 'unalias', 'unset', 'wait',
+})
+
+
+class _OutputRing:
+    """固定大小的输出环形缓冲区（匿名内存映射，只保留最近写入的内容，不随输出量增长）"""
+    
+    def __init__(self, size: int):
+        """
+        Args:
+            size: 缓冲区大小（字节）
+        """
+        import mmap
+        self._size = size
+        self._buf = mmap.mmap(-1, size)
+        self._pos = 0  # 下一次写入位置
+        self._written = 0  # 累计写入字节数
+    
+    def write(self, data) -> None:
+        """
+        写入数据，超出容量时覆盖最旧的内容
+        
+        Args:
+            data: bytes 或 memoryview
+        """
+        data = memoryview(data)[-self._size:]
+        first = min(len(data), self._size - self._pos)
+        self._buf[self._pos:self._pos + first] = data[:first]
+        rest = len(data) - first
+        if rest:
+            self._buf[:rest] = data[first:]
+        self._pos = (self._pos + len(data)) % self._size
+        self._written += len(data)
+    
+    def tail(self) -> bytes:
+        """
+        按写入顺序返回缓冲区中保留的内容
+        
+        Returns:
+            bytes: 最近 min(写入量, 缓冲区大小) 字节
+        """
+        if self._written < self._size:
+            return self._buf[:self._pos]
+        return self._buf[self._pos:] + self._buf[:self._pos]
+    
+    def close(self) -> None:
+        """释放内存映射"""
+        self._buf.close()
+
 
 class LocalCommandExecutor:
     """本地命令执行器类"""
     
-    def __init__(self, working_dir: Optional[str] = None):
+    # 读取伪终端输出的缓冲区大小（64 KiB）
+    READ_BUFFER_SIZE = 64 * 1024
+    # 保留用于失败诊断的输出尾部大小（1 MiB）
+    OUTPUT_TAIL_SIZE = 1024 * 1024
+    
+    # 空闲读取缓冲区池（所有执行器共享，命令之间复用；并发执行的命令各取一块，互不干扰）
+    _read_buffer_pool: "queue.SimpleQueue[bytearray]" = queue.SimpleQueue()
+    
+    # 命令可用性缓存: {(命令, PATH): 是否可用}
+    _which_cache: Dict[Tuple[str, str], bool] = {}
+    
+    def __init__(self, working_dir: Optional[str] = None, output: Optional[Console] = None):
         """
         初始化本地命令执行器
         
         Args:
             working_dir: 工作目录（可选，默认为当前目录）
+            output: 输出控制台（可选，默认输出到终端；并发执行多个命令组时传入写入缓冲区的控制台，
+                    命令输出也写入其中，由调用方在结束后统一输出）
         """
         self.working_dir = working_dir or os.getcwd()
+        self.console = output or console
     
     def execute_command_group(self, commands: List[str], group_name: str, 
                              working_dir: Optional[str] = None,
-                             stop_on_error: bool = True) -> bool:
+                             stop_on_error: bool = True,
+                             parallel_groups: Optional[List[List[str]]] = None,
+                             parallel: bool = False,
+                             max_concurrency: Optional[int] = None) -> bool:
         """
         执行本地命令组
         
         Args:
-            commands: 命令列表
+            commands: 命令列表（按顺序执行）
             group_name: 命令组名称
             working_dir: 工作目录（可选，覆盖初始化时的工作目录）
             stop_on_error: 遇到错误是否停止（默认 True）
+            parallel_groups: 并行命令组（可选，在 commands 之后执行；组与组之间按顺序，组内命令并发）
+            parallel: commands 中的命令互不依赖时设为 True，作为一个并行组并发执行
+            max_concurrency: 同时运行的最大命令数（默认 CPU 核数）
             
         Returns:
             bool: 执行是否成功
         """
-        if not commands:
-            console.print("[yellow]⚠ 命令组为空，跳过执行[/yellow]")
+        if not commands and not parallel_groups:
+            self.console.print("[yellow]⚠ 命令组为空，跳过执行[/yellow]")
             return True
         
         # 确定工作目录
@@ -52,19 +154,25 @@ class LocalCommandExecutor:
         work_dir = os.path.expanduser(work_dir)
         
         if not os.path.exists(work_dir):
-            console.print(Panel.fit(
+            self.console.print(Panel.fit(
                 f"[bold red]❌ 工作目录不存在: {work_dir}[/bold red]",
                 border_style="red"
             ))
             return False
         
-        console.print(f"[cyan]📂 工作目录:[/cyan] {work_dir}")
-        console.print(f"[cyan]📋 命令数量:[/cyan] {len(commands)}")
-        console.print()
+        self.console.print(f"[cyan]📂 工作目录:[/cyan] {work_dir}")
+        self.console.print(f"[cyan]📋 命令数量:[/cyan] {len(commands) + sum(len(g) for g in parallel_groups or [])}")
+        self.console.print()
+        
+        # 互不依赖的命令整体作为第一个并行组
+        if parallel and commands:
+            parallel_groups = [list(commands)] + list(parallel_groups or [])
+            commands = []
         
         # 执行每条命令
         for idx, command in enumerate(commands, 1):
-            console.print(f"[bold yellow]▶ [{idx}/{len(commands)}] 执行命令:[/bold yellow] [cyan]{command}[/cyan]")
+            # 标题与分隔线合并为一次输出
+            self.console.print(f"[bold yellow]▶ [{idx}/{len(commands)}] 执行命令:[/bold yellow] [cyan]{command}[/cyan]\n{_RULE}")
             
             success, output, exit_code = self._execute_single_command(
                 command, 
@@ -72,51 +180,161 @@ class LocalCommandExecutor:
             )
             
             if not success:
+                self.console.print(_RULE)
                 self._handle_command_failure(command, exit_code, output)
                 
                 if stop_on_error:
-                    console.print(Panel.fit(
+                    self.console.print(Panel.fit(
                         f"[bold red]❌ 命令组 '{group_name}' 执行失败（第 {idx} 条命令）[/bold red]",
                         border_style="red"
                     ))
                     return False
                 else:
-                    console.print(f"[yellow]⚠ 命令失败但继续执行后续命令[/yellow]")
+                    self.console.print(f"[yellow]⚠ 命令失败但继续执行后续命令[/yellow]\n")
             else:
-                console.print(f"[green]✓ 命令执行成功[/green]")
-                
-            console.print()
+                self.console.print(f"{_RULE}\n[green]✓ 命令执行成功[/green]\n")
+        
+        # 执行并行命令组
+        if parallel_groups:
+            if not asyncio.run(self._run_parallel_groups(parallel_groups, work_dir, stop_on_error,
+                                                         max_concurrency)):
+                self.console.print(Panel.fit(
+                    f"[bold red]❌ 命令组 '{group_name}' 执行失败（并行命令）[/bold red]",
+                    border_style="red"
+                ))
+                return False
         
-        console.print(Panel.fit(
+        self.console.print(Panel.fit(
             f"[bold green]✓ 命令组 '{group_name}' 执行成功[/bold green]",
             border_style="green"
         ))
-        console.print()
+        self.console.print()
         
         return True
     
-    def _execute_single_command(self, command: str, working_dir: str) -> Tuple[bool, str, int]:
+    async def _run_parallel_groups(self, parallel_groups: List[List[str]], working_dir: str,
+                                   stop_on_error: bool, max_concurrency: Optional[int] = None) -> bool:
         """
-        执行单条命令（实时输出）
+        依次执行各并行组，组内命令并发执行
+        
+        每条命令的输出先缓冲，组结束后按声明顺序统一输出，保证日志顺序稳定。
+        stop_on_error 为 True 时，任一命令失败会取消同组尚未结束的命令并停止后续组。
+        
+        Args:
+            parallel_groups: 并行命令组列表
+            working_dir: 工作目录
+            stop_on_error: 遇到错误是否停止
+            max_concurrency: 同时运行的最大命令数（默认 CPU 核数）
+            
+        Returns:
+            bool: 执行是否成功
+        """
+        all_success = True
+        semaphore = asyncio.Semaphore(max_concurrency or os.cpu_count() or 1)
+        
+        async def run_limited(cmd: str) -> Tuple[str, bytes, int]:
+            async with semaphore:
+                return await self._run_buffered_command(cmd, working_dir)
+        
+        for group_idx, group in enumerate(parallel_groups, 1):
+            self.console.print(f"[bold yellow]▶ 并行组 [{group_idx}/{len(parallel_groups)}]:[/bold yellow] "
+                          f"[cyan]{len(group)} 条命令并发执行[/cyan]")
+            
+            tasks = [asyncio.create_task(run_limited(cmd)) for cmd in group]
+            pending = set(tasks)
+            aborted = False
+            
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if stop_on_error and any(task.result()[2] != 0 for task in done):
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    aborted = True
+                    break
+            
+            # 按声明顺序输出缓冲结果
+            for command, task in zip(group, tasks):
+                header = f"[bold yellow]  • 命令:[/bold yellow] [cyan]{command}[/cyan]"
+                if task.cancelled():
+                    self.console.print(f"{header}\n[yellow]⚠ 已取消（同组命令失败）[/yellow]")
+                    continue
+                
+                _, output, exit_code = task.result()
+                self.console.print(f"{header}\n{_RULE}")
+                if output:
+                    self._output_writer()(output if output.endswith(b"\n") else output + b"\n")
+                
+                if exit_code == 0:
+                    self.console.print(f"{_RULE}\n[green]✓ 命令执行成功[/green]")
+                else:
+                    all_success = False
+                    self.console.print(_RULE)
+                    self._handle_command_failure(command, exit_code, output)
+            
+            self.console.print()
+            
+            if aborted or (stop_on_error and not all_success):
+                return False
+        
+        return all_success or not stop_on_error
+    
+    async def _run_buffered_command(self, command: str, working_dir: str) -> Tuple[str, bytes, int]:
+        """
+        异步执行单条命令并缓冲其输出
         
         Args:
             command: 要执行的命令
             working_dir: 工作目录
             
         Returns:
-            Tuple[bool, str, int]: (是否成功, 输出, 退出码)
+            Tuple[str, bytes, int]: (命令, 原始输出, 退出码)
         """
         try:
-            import sys
-            import select
-            import pty
-            import fcntl
-            import termios
-            import struct
-            import time
-            
-            console.print("[dim]" + "─" * 60 + "[/dim]")
+            process = await asyncio.create_subprocess_shell(
+                command,
+                cwd=working_dir,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                stdin=asyncio.subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except Exception as e:
+            return command, str(e).encode('utf-8'), -1
+        
+        try:
+            stdout, _ = await process.communicate()
+        except asyncio.CancelledError:
+            # 被取消时终止整个进程组（shell 启动的 npm、mvn 等子进程也一起终止），避免遗留后台进程
+            if process.returncode is None:
+                try:
+                    if os.name == 'posix':
+                        os.killpg(process.pid, signal.SIGKILL)
+                    else:
+                        process.kill()
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+            raise
+        
+        return command, stdout, process.returncode
+    
+    def _execute_single_command(self, command: str, working_dir: str) -> Tuple[bool, bytes, int]:
+        """
+        执行单条命令（实时输出）
+        
+        Args:
+            command: 要执行的命令
+            working_dir: 工作目录
             
+        Returns:
+            Tuple[bool, bytes, int]: (是否成功, 原始输出, 退出码)；
+                输出仅在失败时返回，且最多保留最后 OUTPUT_TAIL_SIZE 字节
+        """
+        if not _HAS_PTY:
+            return self._execute_piped_command(command, working_dir)
+        
+        try:
             # 使用 pty 创建伪终端，让命令认为它在真实终端中运行
             master_fd, slave_fd = pty.openpty()
             
@@ -125,15 +343,17 @@ class LocalCommandExecutor:
             fcntl.ioctl(slave_fd, termios.TIOCSWINSZ, winsize)
             
             # 启动进程
+            # 简单命令直接执行，其余经 /bin/sh 解释；start_new_session 等价于 os.setsid，但不需要 Python 层的 fork 回调
+            argv = self._build_argv(command, working_dir)
             process = subprocess.Popen(
-                command,
-                shell=True,
+                argv if argv is not None else command,
+                shell=argv is None,
                 cwd=working_dir,
                 stdout=slave_fd,
                 stderr=slave_fd,
                 stdin=slave_fd,
                 close_fds=True,
-                preexec_fn=os.setsid
+                start_new_session=True
             )
             
             # 关闭子进程端的文件描述符
@@ -143,48 +363,55 @@ class LocalCommandExecutor:
             flags = fcntl.fcntl(master_fd, fcntl.F_GETFL)
             fcntl.fcntl(master_fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
             
-            # 实时读取并输出
-            output_lines = []
-            no_data_count = 0
+            # 读循环阻塞等待数据或进程结束通知，无需定时轮询
+            exit_fds, waiter = self._watch_exit(process)
+            exit_r = exit_fds[0]
             
-            while True:
-                # 检查进程是否结束
-                poll_result = process.poll()
-                
-                # 使用 select 等待数据
-                try:
-                    readable, _, _ = select.select([master_fd], [], [], 0.1)
-                    
-                    if readable:
-                        try:
-                            data = os.read(master_fd, 4096)
-                            if data:
-                                text = data.decode('utf-8', errors='replace')
-                                # 直接输出到终端（保留所有控制字符）
-                                sys.stdout.write(text)
-                                sys.stdout.flush()
-                                output_lines.append(text)
-                                no_data_count = 0
-                            else:
-                                # 没有数据了
-                                no_data_count += 1
-                        except OSError as e:
-                            # 读取结束
-                            if e.errno == 5:  # Input/output error
-                                break
-                            no_data_count += 1
-                    else:
-                        no_data_count += 1
-                    
-                    # 如果进程已结束
-                    if poll_result is not None:
-                        # 再尝试读取几次，确保所有数据都读完
-                        if no_data_count > 3:
-                            break
-                        time.sleep(0.05)
-                        
-                except Exception:
-                    break
+            # 实时读取并输出：从缓冲区池取一块 64 KiB 缓冲区反复读取，原始字节直接写入终端，
+            # 完整输出保留为字节，只在命令失败时解码一次（也避免多字节字符被拆在两次读取之间）
+            try:
+                read_buf = self._read_buffer_pool.get_nowait()
+            except queue.Empty:
+                read_buf = bytearray(self.READ_BUFFER_SIZE)
+            read_view = memoryview(read_buf)
+            output_ring = _OutputRing(self.OUTPUT_TAIL_SIZE)  # 已输出内容的尾部，用于失败诊断
+            write_output = self._output_writer()
+            
+            def drain_master() -> bool:
+                """读取当前可读的全部输出，返回伪终端是否已关闭"""
+                while True:
+                    try:
+                        size = os.readv(master_fd, [read_buf])
+                    except BlockingIOError:
+                        return False
+                    except OSError:
+                        # EIO: 子进程端已全部关闭
+                        return True
+                    if not size:
+                        return True
+                    chunk = read_view[:size]
+                    output_ring.write(chunk)
+                    # 直接输出到终端（保留所有控制字符）
+                    write_output(chunk)
+            
+            try:
+                while True:
+                    readable, _, _ = select.select([master_fd, exit_r], [], [])
+                    if master_fd in readable and drain_master():
+                        break
+                    if exit_r in readable:
+                        # 进程已结束，读完剩余输出后退出（后台子进程仍占用终端时不再等待）
+                        drain_master()
+                        break
+            finally:
+                # 等待线程写完结束信号后再关闭通知描述符
+                if waiter is not None:
+                    waiter.join()
+                for fd in exit_fds:
+                    os.close(fd)
+                # 归还读取缓冲区
+                read_view.release()
+                self._read_buffer_pool.put(read_buf)
             
             # 等待进程结束
             exit_code = process.wait()
@@ -195,54 +422,230 @@ class LocalCommandExecutor:
             except:
                 pass
             
-            print()  # 确保最后有换行
-            console.print("[dim]" + "─" * 60 + "[/dim]")
+            self.console.print()  # 确保最后有换行（结尾分隔线由调用方输出）
             
             # 判断是否成功
             success = exit_code == 0
             
-            # 合并输出
-            output = ''.join(output_lines)
+            # 成功时输出无人使用，直接丢弃；失败时返回原始字节尾部，由 _handle_command_failure 解码
+            output = output_ring.tail() if not success else b''
+            output_ring.close()
             
             return success, output, exit_code
             
         except Exception as e:
-            console.print(Panel.fit(
+            self.console.print(Panel.fit(
                 f"[bold red]❌ 命令执行异常: {e}[/bold red]",
                 border_style="red"
             ))
             import traceback
             traceback.print_exc()
-            return False, str(e), -1
+            return False, str(e).encode('utf-8'), -1
     
-    def _handle_command_failure(self, command: str, exit_code: int, output: str):
+    def _execute_piped_command(self, command: str, working_dir: str) -> Tuple[bool, bytes, int]:
+        """
+        执行单条命令（无伪终端时的实现，通过管道实时读取输出）
+        
+        Args:
+            command: 要执行的命令
+            working_dir: 工作目录
+            
+        Returns:
+            Tuple[bool, bytes, int]: (是否成功, 原始输出, 退出码)；
+                输出仅在失败时返回，且最多保留最后 OUTPUT_TAIL_SIZE 字节
+        """
+        try:
+            argv = self._build_argv(command, working_dir)
+            process = subprocess.Popen(
+                argv if argv is not None else command,
+                shell=argv is None,
+                cwd=working_dir,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                bufsize=0
+            )
+            
+            output_ring = _OutputRing(self.OUTPUT_TAIL_SIZE)
+            write_output = self._output_writer()
+            
+            # 无缓冲管道直接 readinto 池中的缓冲区：有数据即返回（输出仍是实时的），也不再经过 BufferedReader 复制
+            try:
+                read_buf = self._read_buffer_pool.get_nowait()
+            except queue.Empty:
+                read_buf = bytearray(self.READ_BUFFER_SIZE)
+            read_view = memoryview(read_buf)
+            try:
+                while True:
+                    size = process.stdout.readinto(read_buf)
+                    if not size:
+                        break
+                    chunk = read_view[:size]
+                    output_ring.write(chunk)
+                    write_output(chunk)
+            finally:
+                read_view.release()
+                self._read_buffer_pool.put(read_buf)
+            
+            process.stdout.close()
+            exit_code = process.wait()
+            self.console.print()
+            
+            success = exit_code == 0
+            output = output_ring.tail() if not success else b''
+            output_ring.close()
+            
+            return success, output, exit_code
+            
+        except Exception as e:
+            self.console.print(Panel.fit(
+                f"[bold red]❌ 命令执行异常: {e}[/bold red]",
+                border_style="red"
+            ))
+            import traceback
+            traceback.print_exc()
+            return False, str(e).encode('utf-8'), -1
+    
+    @staticmethod
+    def _watch_exit(process) -> Tuple[List[int], Optional[threading.Thread]]:
+        """
+        获取一个在子进程结束时变为可读的文件描述符，供 select 等待
+        
+        优先使用 pidfd（Linux 5.3+，不需要额外线程和信号处理）；不支持时由等待线程在进程结束后写入自管道
+        
+        Args:
+            process: 子进程（subprocess.Popen）
+            
+        Returns:
+            Tuple[List[int], Optional[threading.Thread]]: (需要关闭的描述符，第一个用于 select, 等待线程)
+        """
+        pidfd_open = getattr(os, 'pidfd_open', None)
+        if pidfd_open is not None:
+            try:
+                return [pidfd_open(process.pid)], None
+            except OSError:
+                # 内核不支持或被沙箱禁止
+                pass
+        
+        exit_r, exit_w = os.pipe()
+        
+        def notify_exit():
+            process.wait()
+            os.write(exit_w, b'\0')
+        
+        waiter = threading.Thread(target=notify_exit, daemon=True)
+        waiter.start()
+        return [exit_r, exit_w], waiter
+    
+    def _build_argv(self, command: str, working_dir: str) -> Optional[List[str]]:
+        """
+        不含 shell 特殊字符的简单命令直接拆分为参数列表，省去中间的 /bin/sh 进程
+        
+        Args:
+            command: 要执行的命令
+            working_dir: 工作目录
+            
+        Returns:
+            Optional[List[str]]: 参数列表；需要 shell 解释（或程序找不到，交给 shell 报错）时返回 None，
+                非 POSIX 系统上始终返回 None（Windows 的 npm、mvn 等是 .cmd/.bat 脚本，只能经 shell 执行，
+                shlex 的 POSIX 规则也会去掉 Windows 路径中的反斜杠）
+        """
+        if os.name != 'posix' or _NEEDS_SHELL.search(command):
+            return None
+        argv = shlex.split(command)
+        if not argv or argv[0] in _SHELL_BUILTINS:
+            return None
+        program = argv[0]
+        if os.sep in program or '/' in program:
+            # 相对路径相对于工作目录解析
+            if not os.access(os.path.join(working_dir, program), os.X_OK):
+                return None
+        elif not self.test_command_available(program):
+            return None
+        return argv
+    
+    def _output_writer(self) -> Callable[[bytes], None]:
+        """
+        返回把命令原始输出写入终端的函数（所有原始字节输出都经过这里，不经过 Rich 渲染）
+        
+        输出到捕获控制台时，增量解码后写入其文件对象，与其余输出保持顺序；
+        类 Unix 系统上直接 os.write 到标准输出的文件描述符（不经过 Python 缓冲层的复制，也不需要每块 flush），
+        标准输出被设为非阻塞时等待可写后重试；
+        否则写入 sys.stdout.buffer，没有字节接口时才增量解码后写文本
+        
+        Returns:
+            Callable[[bytes], None]: 输出函数
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        
+        if self.console is not console:
+            out = self.console.file
+            
+            def write_captured(data):
+                out.write(decoder.decode(data))
+            return write_captured
+        
+        sys.stdout.flush()  # 先写出 Rich 等已缓冲的内容，保证顺序
+        
+        fd = None
+        if os.name == 'posix' and _HAS_PTY:
+            try:
+                fd = sys.stdout.fileno()
+            except (AttributeError, OSError, ValueError):
+                fd = None
+        if fd is not None:
+            def write_fd(data):
+                view = memoryview(data)
+                while view:
+                    try:
+                        view = view[os.write(fd, view):]
+                    except BlockingIOError:
+                        # 非阻塞的标准输出（部分 CI 环境）暂时写满，等待可写
+                        select.select([], [fd], [])
+            return write_fd
+        
+        stdout_bin = getattr(sys.stdout, 'buffer', None)
+        if stdout_bin is not None:
+            def write_buffer(data):
+                stdout_bin.write(data)
+                stdout_bin.flush()
+            return write_buffer
+        
+        def write_text(data):
+            sys.stdout.write(decoder.decode(data))
+            sys.stdout.flush()
+        return write_text
+    
+    def _handle_command_failure(self, command: str, exit_code: int, output: Union[str, bytes]):
         """
         处理命令执行失败
         
         Args:
             command: 失败的命令
             exit_code: 退出码
-            output: 输出信息
+            output: 输出信息（原始字节，去除 ANSI 控制序列后直接写出，不经过 Rich 解析）
         """
-        console.print()
-        console.print("[bold red]" + "=" * 60 + "[/bold red]")
-        console.print("[bold red]命令执行失败[/bold red]")
-        console.print("[bold red]" + "=" * 60 + "[/bold red]")
-        console.print(f"[red]命令:[/red] {command}")
-        console.print(f"[red]退出码:[/red] {exit_code}")
-        
-        if output and output.strip():
-            console.print("[red]错误输出:[/red]")
-            console.print("[dim]" + "-" * 60 + "[/dim]")
-            console.print(output.strip())
-            console.print("[dim]" + "-" * 60 + "[/dim]")
-        
-        console.print()
+        if isinstance(output, str):
+            output = output.encode('utf-8', errors='replace')
+        output = _ANSI_RE.sub(b'', output).strip()
+        self.console.print()
+        self.console.print("[bold red]" + "=" * 60 + "[/bold red]")
+        self.console.print("[bold red]命令执行失败[/bold red]")
+        self.console.print("[bold red]" + "=" * 60 + "[/bold red]")
+        self.console.print(f"[red]命令:[/red] {command}")
+        self.console.print(f"[red]退出码:[/red] {exit_code}")
+        
+        if output:
+            self.console.print("[red]错误输出:[/red]\n[dim]" + "-" * 60 + "[/dim]")
+            self._output_writer()(output + b'\n')
+            self.console.print("[dim]" + "-" * 60 + "[/dim]")
+        
+        self.console.print()
     
-    @staticmethod
-    def test_command_available(command: str) -> bool:
+    @classmethod
+    def test_command_available(cls, command: str) -> bool:
         """
-        测试命令是否可用
+        测试命令是否可用（按命令名和当前 PATH 缓存结果）
         
         Args:
             command: 命令名称（如 'mvn', 'npm', 'python'）
@@ -250,17 +653,12 @@ class LocalCommandExecutor:
         Returns:
             bool: 命令是否可用
         """
-        try:
-            # 使用 which 命令检查（Unix/Linux/macOS）
-            result = subprocess.run(
-                ['which', command],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            return result.returncode == 0
-        except Exception:
-            return False
+        cache_key = (command, os.environ.get('PATH', ''))
+        found = cls._which_cache.get(cache_key)
+        if found is None:
+            # shutil.which 直接在 PATH 中查找，无需启动 which 进程（Windows 上同样可用）
+            found = cls._which_cache[cache_key] = shutil.which(command) is not None
+        return found
 
 
 if __name__ == '__main__':
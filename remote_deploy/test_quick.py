@@ -13,7 +13,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from remote_deploy.config_manager import ConfigManager
+from remote_deploy.config_manager import load_config_manager
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -33,9 +33,9 @@ def test_config_manager():
     console.print()
     
     # 测试加载配置（使用默认配置路径）
-    config_manager = ConfigManager()
+    config_manager = load_config_manager()
     
-    if not config_manager.load_config():
+    if config_manager is None:
         console.print(Panel.fit(
             "[bold red]❌ 配置加载失败[/bold red]",
             border_style="red"
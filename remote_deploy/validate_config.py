@@ -14,15 +14,19 @@ from typing import Optional
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from remote_deploy.config_manager import ConfigManager
+from remote_deploy.config_manager import ConfigManager, load_config_manager
 from common.log_utils import log_error
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from rich.text import Text
 from rich import box
 
 console = Console()
 
+# 未配置提示（单元格直接使用 Text 对象，渲染时不再逐个解析标记）
+_NOT_CONFIGURED = Text("⚠ 未配置", style="yellow")
+
 
 def show_servers_table(servers: list, title: Optional[str] = None):
     """
@@ -61,39 +65,25 @@ def show_servers_table(servers: list, title: Optional[str] = None):
         auth_type = auth['type']
         
         # 检查密码状态
-        if auth['type'] == 'ssh_key':
-            if 'password' in auth and auth['password']:
-                password_status = "🔑 密钥+密码"
-            else:
-                password_status = "🔑 仅密钥"
-        elif auth['type'] == 'password':
-            if 'password' in auth and auth['password']:
-                password_status = "✓ 已配置"
-            else:
-                password_status = "⚠ 未配置"
+        if auth_type == 'ssh_key':
+            password_status = "🔑 密钥+密码" if auth.get('password') else "🔑 仅密钥"
+        elif auth_type == 'password':
+            password_status = "✓ 已配置" if auth.get('password') else "⚠ 未配置"
         else:
             password_status = "-"
         
-        # 检查上传配置
-        if 'upload' in server:
-            upload_types = ', '.join(list(server['upload'].keys()))
-        else:
-            upload_types = "[yellow]⚠ 未配置[/yellow]"
+        # 检查上传配置、命令配置
+        upload_types = Text(', '.join(server['upload'])) if 'upload' in server else _NOT_CONFIGURED
+        command_groups = Text(', '.join(server['commands'])) if 'commands' in server else _NOT_CONFIGURED
         
-        # 检查命令配置
-        if 'commands' in server:
-            command_groups = ', '.join(list(server['commands'].keys()))
-        else:
-            command_groups = "[yellow]⚠ 未配置[/yellow]"
-        
-        # 添加表格行
+        # 添加表格行（全部为 Text 对象，服务器名称中的方括号也不会被当作标记）
         table.add_row(
-            str(idx),
-            server['name'],
-            f"{server['host']}:{server['port']}",
-            server['username'],
-            auth_type,
-            password_status,
+            Text(str(idx)),
+            Text(server['name']),
+            Text(f"{server['host']}:{server['port']}"),
+            Text(str(server['username'])),
+            Text(auth_type),
+            Text(password_status),
             upload_types,
             command_groups
         )
@@ -111,11 +101,9 @@ def validate_config(config_path: str):
     ))
     console.print()
     
-    # 创建配置管理器
-    config_manager = ConfigManager(config_path)
-    
-    # 加载并验证配置
-    if not config_manager.load_config():
+    # 加载并验证配置（每次得到新的配置管理器，YAML 解析结果按配置文件状态缓存）
+    config_manager = load_config_manager(config_path)
+    if config_manager is None:
         console.print(Panel.fit(
             "[bold red]❌ 配置验证失败！[/bold red]",
             border_style="red"